@@ -0,0 +1,428 @@
+# MIT License
+#
+# Copyright (c) 2025 XianYin69
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# 文件名: 晶体管放大电路差分测试.py
+# 功能: 随机生成共射极放大电路（包括零/无穷大电阻、beta=0、截止等边界情况），
+#      同时交给 晶体管共射极放大电路.py（参考实现）和 晶体管放大电路（OOP Version）.py 计算，
+#      对比两者的结果并对不一致的情况分类统计，可用多个进程并行运行数百万个用例。
+# 注意: 参考实现是逐行提问的脚本，这里把它编译一次后在每个用例中用预先生成的回答执行，不会真的等待输入。
+# 用法: python 晶体管放大电路差分测试.py --cases 1000000 --workers 8
+
+from typing import Dict, List, Optional, Tuple
+import argparse
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REFERENCE_PATH = os.path.join(BASE_DIR, "晶体管共射极放大电路.py")
+OOP_PATH = os.path.join(BASE_DIR, "晶体管放大电路（OOP Version）.py")
+
+# 参与对比的结果字段：(参考实现中的变量名, OOP 版本结果中的键)
+FIELDS: List[Tuple[str, str]] = [
+    ('Vb', 'vb'), ('Ve', 've'), ('Ib', 'ib'), ('Ic', 'ic'), ('Ie', 'ie'), ('Vce', 'vce'),
+    ('rbe', 'rbe'), ('Au', 'au'), ('Ri', 'ri'), ('Ro', 'ro'),
+]
+
+# 不一致的分类（按判断顺序）
+AGREE = 'agree' # 所有字段一致
+REFERENCE_ERROR = 'reference_error' # 参考实现抛出异常
+CANDIDATE_ERROR = 'candidate_error' # OOP 版本抛出异常或返回错误
+CUTOFF_MISMATCH = 'cutoff_mismatch' # 一方判定截止 (Ic = 0)，另一方有电流
+NAN_MISMATCH = 'nan_mismatch' # 一方为 NaN，另一方不是
+INF_MISMATCH = 'inf_mismatch' # 一方为无穷大，另一方为有限值（或符号相反的无穷大）
+VALUE_MISMATCH = 'value_mismatch' # 两者都是有限值，但相对误差超过容差
+CATEGORIES = [AGREE, REFERENCE_ERROR, CANDIDATE_ERROR, CUTOFF_MISMATCH, NAN_MISMATCH, INF_MISMATCH, VALUE_MISMATCH]
+
+
+def load_oop_module():
+    """按文件路径导入 OOP 版本（文件名不是合法的模块名，不能直接 import）。"""
+    spec = importlib.util.spec_from_file_location("transistor_amplifier_oop", OOP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def compile_reference():
+    """读取并编译参考实现，每个进程只编译一次。"""
+    with open(REFERENCE_PATH, encoding='utf-8') as f:
+        return compile(f.read(), REFERENCE_PATH, 'exec')
+
+
+# --- 用例生成 ---
+
+def _random_resistance(rng: random.Random) -> float:
+    """随机电阻值 (kOhm)：大部分为 10 Ohm ~ 1 MOhm 的对数均匀分布，少量为 0、无穷大和极端值。"""
+    r = rng.random()
+    if r < 0.04:
+        return 0.0
+    if r < 0.07:
+        return float('inf')
+    if r < 0.09:
+        return rng.choice([1e-9, 1e-6, 1e6, 1e9])
+    return 10 ** rng.uniform(-2, 3)
+
+
+def _random_group(rng: random.Random) -> Tuple[str, List[float]]:
+    """随机电阻组：('multi', [若干个电阻])、('single', [一个电阻]) 或 ('none', [])。"""
+    r = rng.random()
+    if r < 0.5:
+        return 'single', [_random_resistance(rng)]
+    if r < 0.85:
+        return 'multi', [_random_resistance(rng) for _ in range(rng.randint(0, 3))]
+    return 'none', []
+
+
+def generate_case(rng: random.Random) -> dict:
+    """随机生成一个共射极放大电路用例。"""
+    r = rng.random()
+    if r < 0.05:
+        beta = 0.0
+    elif r < 0.08:
+        beta = rng.choice([1.0, 1e6])
+    else:
+        beta = round(10 ** rng.uniform(1, 3), 3)
+
+    r = rng.random()
+    if r < 0.05:
+        vcc = 0.0
+    elif r < 0.12:
+        vcc = rng.uniform(0.0, 0.7) # 低于 Vbe，容易截止
+    else:
+        vcc = round(rng.uniform(1.0, 30.0), 3)
+
+    r = rng.random()
+    if r < 0.6:
+        bias = 'divider'
+        rb_up = [_random_resistance(rng) for _ in range(rng.randint(0, 3))]
+        rb_down = [_random_resistance(rng) for _ in range(rng.randint(0, 3))]
+    elif r < 0.9:
+        bias, rb_up, rb_down = 'single', [_random_resistance(rng)], []
+    else:
+        bias, rb_up, rb_down = 'none', [], []
+
+    rc_mode, rc = _random_group(rng)
+    re_mode, re_dc = _random_group(rng)
+    re_ac = [_random_resistance(rng) for _ in range(rng.randint(1, 2))] if rng.random() < 0.5 else []
+
+    return {
+        'vcc': vcc, 'beta': beta, 'rl': _random_resistance(rng), 'transistor_type': rng.choice([1, 2]),
+        'bias': bias, 'rb_up': rb_up, 'rb_down': rb_down,
+        'rc_mode': rc_mode, 'rc': rc, 're_mode': re_mode, 're_dc': re_dc,
+        'rbb': round(rng.uniform(0.0, 0.5), 4), 're_ac': re_ac,
+    }
+
+
+# --- 两种实现的调用方式 ---
+
+def _group_answers(mode: str, values: List[float]) -> List[str]:
+    """参考实现中 Rc/Re 的回答序列。"""
+    if mode == 'multi':
+        return ['y', str(len(values))] + [repr(v) for v in values]
+    if mode == 'single':
+        return ['n', 'y', repr(values[0])]
+    return ['n', 'n']
+
+
+def reference_answers(case: dict) -> List[str]:
+    """把用例转换为参考实现依次提问时的回答。"""
+    answers = [repr(case['vcc']), repr(case['beta']), repr(case['rl'])]
+    if case['bias'] == 'divider':
+        answers += ['y', str(len(case['rb_up']))] + [repr(v) for v in case['rb_up']]
+        answers += [str(len(case['rb_down']))] + [repr(v) for v in case['rb_down']]
+    elif case['bias'] == 'single':
+        answers += ['n', 'y', repr(case['rb_up'][0])]
+    else:
+        answers += ['n', 'n']
+    answers += _group_answers(case['rc_mode'], case['rc'])
+    answers += _group_answers(case['re_mode'], case['re_dc'])
+    answers += [str(case['transistor_type']), 'y', repr(case['rbb'])]
+    if case['re_ac']:
+        answers += ['y', str(len(case['re_ac']))] + [repr(v) for v in case['re_ac']]
+    else:
+        answers += ['n']
+    return answers
+
+
+def oop_spec(case: dict) -> dict:
+    """把用例转换为 OOP 版本的电路描述（与交互输入同样的电阻连接方式）。"""
+    return {
+        'topology': 'ce', 'vcc': case['vcc'], 'rl': case['rl'],
+        'transistor': {'beta': case['beta'], 'vbe': 0.6 if case['transistor_type'] == 1 else 0.2, 'rbb': case['rbb']},
+        'rb_up': case['rb_up'], 'rb_down': case['rb_down'], 'rc': case['rc'], 're_dc': case['re_dc'],
+        're_ac': case['re_ac'],
+    }
+
+
+def _silent_print(*args, **kwargs):
+    pass
+
+
+def run_reference(code, case: dict) -> Dict[str, float]:
+    """执行参考实现，返回各字段的值；输入、输出都被替换，不会与终端交互。"""
+    answers = iter(reference_answers(case))
+    namespace = {'__name__': '__differential_test__', 'input': lambda prompt='': next(answers),
+                 'print': _silent_print}
+    exec(code, namespace)
+    return {name: namespace[name] for name, _ in FIELDS}
+
+
+def run_candidate_batch(oop, cases: List[dict]) -> List[dict]:
+    """用 OOP 版本的批量计算 evaluate_batch 计算一组用例。"""
+    return oop.evaluate_batch([oop_spec(case) for case in cases])
+
+
+def run_candidate_object(oop, cases: List[dict]) -> List[dict]:
+    """用 OOP 版本的放大电路对象逐个计算一组用例。"""
+    results = []
+    for case in cases:
+        circuit = oop.TransistorAmplifier.from_dict(oop_spec(case))
+        circuit.calculate_dc_operating_point(verbose=False)
+        circuit.compute_ac_characteristics()
+        results.append(circuit.to_dict())
+    return results
+
+
+CANDIDATE_ENGINES = {'batch': run_candidate_batch, 'object': run_candidate_object}
+
+
+# --- 结果对比 ---
+
+def compare_field(reference: float, candidate: float, rtol: float) -> Optional[str]:
+    """对比一个字段，一致时返回 None，否则返回不一致的分类。"""
+    if math.isnan(reference) and math.isnan(candidate):
+        return None
+    if math.isnan(reference) or math.isnan(candidate):
+        return NAN_MISMATCH
+    if math.isinf(reference) or math.isinf(candidate):
+        return None if reference == candidate else INF_MISMATCH
+    if abs(reference - candidate) <= rtol * max(abs(reference), abs(candidate), 1e-12):
+        return None
+    return VALUE_MISMATCH
+
+
+def classify(reference: Dict[str, float], candidate: dict, rtol: float) -> Tuple[str, List[str]]:
+    """对比一个用例的全部字段，返回 (分类, 不一致的字段列表)。"""
+    fields = []
+    categories = []
+    for ref_name, key in FIELDS:
+        category = compare_field(float(reference[ref_name]), float(candidate[key]), rtol)
+        if category is not None:
+            fields.append(key)
+            categories.append(category)
+    if not fields:
+        return AGREE, fields
+    ic_ref, ic_cand = float(reference['Ic']), float(candidate['ic'])
+    if (ic_ref == 0.0) != (ic_cand == 0.0) and not (math.isnan(ic_ref) or math.isnan(ic_cand)):
+        return CUTOFF_MISMATCH, fields
+    # 取最严重的一类：NaN > 无穷大 > 数值误差
+    for category in (NAN_MISMATCH, INF_MISMATCH, VALUE_MISMATCH):
+        if category in categories:
+            return category, fields
+    return VALUE_MISMATCH, fields
+
+
+class Tally:
+    """一个进程（或合并后全部进程）的统计结果，可以合并。"""
+    def __init__(self, max_examples: int = 3):
+        self.max_examples = max_examples
+        self.cases: int = 0
+        self.categories: Dict[str, int] = {category: 0 for category in CATEGORIES}
+        self.fields: Dict[str, int] = {} # "分类:字段" -> 次数
+        self.bias: Dict[str, int] = {} # "分类:偏置方式" -> 次数
+        self.examples: Dict[str, List[dict]] = {}
+        self.reference_seconds: float = 0.0
+        self.candidate_seconds: float = 0.0
+
+    def add(self, category: str, fields: List[str], case: dict, reference, candidate):
+        """记录一个用例的分类结果。"""
+        self.cases += 1
+        self.categories[category] += 1
+        for field in fields:
+            key = f"{category}:{field}"
+            self.fields[key] = self.fields.get(key, 0) + 1
+        key = f"{category}:{case['bias']}"
+        self.bias[key] = self.bias.get(key, 0) + 1
+        if category != AGREE:
+            examples = self.examples.setdefault(category, [])
+            if len(examples) < self.max_examples:
+                examples.append({'case': case, 'fields': fields, 'reference': reference, 'candidate': candidate})
+
+    def merge(self, other: 'Tally'):
+        """合并另一个统计结果。"""
+        self.cases += other.cases
+        for category, count in other.categories.items():
+            self.categories[category] += count
+        for key, count in other.fields.items():
+            self.fields[key] = self.fields.get(key, 0) + count
+        for key, count in other.bias.items():
+            self.bias[key] = self.bias.get(key, 0) + count
+        for category, examples in other.examples.items():
+            mine = self.examples.setdefault(category, [])
+            mine.extend(examples[:self.max_examples - len(mine)])
+        self.reference_seconds += other.reference_seconds
+        self.candidate_seconds += other.candidate_seconds
+
+
+# --- 并行执行 ---
+
+_worker_state: dict = {}
+
+
+def _init_worker():
+    """进程初始化：导入 OOP 版本并编译参考实现。"""
+    _worker_state['oop'] = load_oop_module()
+    _worker_state['reference'] = compile_reference()
+
+
+def run_chunk(task: Tuple[int, int, str, float, int]) -> Tally:
+    """运行一块用例：(随机种子, 用例数, 被测实现, 相对容差, 每类保留的示例数)。"""
+    seed, count, engine, rtol, max_examples = task
+    if not _worker_state:
+        _init_worker()
+    oop, code = _worker_state['oop'], _worker_state['reference']
+    rng = random.Random(seed)
+    cases = [generate_case(rng) for _ in range(count)]
+    tally = Tally(max_examples)
+
+    start = time.perf_counter()
+    references = []
+    for case in cases:
+        try:
+            references.append(run_reference(code, case))
+        except Exception as e:
+            references.append(e)
+    tally.reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        candidates = CANDIDATE_ENGINES[engine](oop, cases)
+    except Exception:
+        # 整块计算失败时逐个计算，找出出错的用例
+        candidates = []
+        for case in cases:
+            try:
+                candidates.append(CANDIDATE_ENGINES[engine](oop, [case])[0])
+            except Exception as e:
+                candidates.append({'error': f"{type(e).__name__}: {e}"})
+    tally.candidate_seconds = time.perf_counter() - start
+
+    for case, reference, candidate in zip(cases, references, candidates):
+        if isinstance(reference, Exception):
+            tally.add(REFERENCE_ERROR, [], case, f"{type(reference).__name__}: {reference}", candidate)
+        elif 'error' in candidate:
+            tally.add(CANDIDATE_ERROR, [], case, reference, candidate)
+        else:
+            category, fields = classify(reference, candidate, rtol)
+            tally.add(category, fields, case, reference, candidate)
+    return tally
+
+
+def run_differential(cases: int, workers: int, chunk: int, seed: int, engine: str, rtol: float,
+                     max_examples: int = 3, progress: bool = True) -> Tuple[Tally, float]:
+    """并行运行全部用例，返回 (合并后的统计结果, 总耗时秒数)。"""
+    tasks = []
+    for index, start in enumerate(range(0, cases, chunk)):
+        tasks.append((seed * 1000003 + index, min(chunk, cases - start), engine, rtol, max_examples))
+
+    total = Tally(max_examples)
+    start = time.perf_counter()
+    if workers <= 1:
+        results = map(run_chunk, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker)
+        results = pool.imap_unordered(run_chunk, tasks)
+    try:
+        for tally in results:
+            total.merge(tally)
+            if progress:
+                elapsed = time.perf_counter() - start
+                sys.stderr.write(f"\r已完成 {total.cases}/{cases} 个用例，{total.cases / elapsed:,.0f} 个/秒")
+                sys.stderr.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if progress:
+        sys.stderr.write("\n")
+    return total, time.perf_counter() - start
+
+
+def print_report(tally: Tally, elapsed: float, workers: int, engine: str):
+    """输出分类统计和吞吐量报告。"""
+    print(f"\n差分测试结果（参考实现：晶体管共射极放大电路.py，被测实现：OOP Version {engine}）：")
+    for category in CATEGORIES:
+        count = tally.categories[category]
+        print(f"{category:>16}：{count:>10}（{count / tally.cases * 100 if tally.cases else 0.0:.2f} %）")
+
+    if tally.bias:
+        print("\n按偏置方式（divider 分压偏置，single 单个 Rb，none 无偏置电阻）：")
+        for key, count in sorted(tally.bias.items()):
+            print(f"{key:>24}：{count}")
+
+    if tally.fields:
+        print("\n不一致的字段：")
+        for key, count in sorted(tally.fields.items(), key=lambda item: -item[1]):
+            print(f"{key:>24}：{count}")
+
+    print("\n吞吐量：")
+    print(f"用例总数 {tally.cases}，进程数 {workers}，总耗时 {elapsed:.3f} 秒，{tally.cases / elapsed if elapsed else 0.0:,.0f} 个/秒")
+    if tally.cases:
+        print(f"参考实现 {tally.reference_seconds / tally.cases * 1e6:.2f} us/个，"
+              f"被测实现 {tally.candidate_seconds / tally.cases * 1e6:.2f} us/个（各进程 CPU 时间之和）")
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="对比 晶体管共射极放大电路.py 与 OOP 版本的计算结果。")
+    parser.add_argument('--cases', type=int, default=100000, help="用例总数（默认 100000）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="并行进程数（默认为 CPU 核数）")
+    parser.add_argument('--chunk', type=int, default=2000, help="每个任务的用例数（默认 2000）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子（相同种子生成相同的用例）")
+    parser.add_argument('--engine', choices=sorted(CANDIDATE_ENGINES), default='batch',
+                        help="被测实现：batch 批量计算（默认）或 object 放大电路对象")
+    parser.add_argument('--rtol', type=float, default=1e-9, help="数值比较的相对容差（默认 1e-9）")
+    parser.add_argument('--examples', type=int, default=3, help="每类不一致保留的示例数（默认 3）")
+    parser.add_argument('--json', metavar='FILE', help="把统计结果和示例写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    tally, elapsed = run_differential(args.cases, args.workers, args.chunk, args.seed, args.engine,
+                                      args.rtol, args.examples)
+    print_report(tally, elapsed, args.workers, args.engine)
+
+    if args.json:
+        report = {
+            'cases': tally.cases, 'elapsed': elapsed, 'workers': args.workers, 'engine': args.engine,
+            'categories': tally.categories, 'bias': tally.bias, 'fields': tally.fields, 'examples': tally.examples,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
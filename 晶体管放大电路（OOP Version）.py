@@ -21,11 +21,23 @@
 # SOFTWARE.
 
 # 文件名: 晶体管放大电路（OOP Version）.py
-# 功能: 使用面向对象思想计算晶体管共射极放大电路的直流工作点和交流小信号参数。
-# 注意: 本程序仅适用于分析典型的晶体管共射极放大电路，不适用于其他复杂电路或特殊情况。
+# 功能: 使用面向对象思想计算晶体管共射极、共集电极、共基极放大电路的直流工作点和交流小信号参数，
+#      支持交互输入单个电路（--topology 选择组态）、批量计算（--batch）和常驻的管道模式（--pipe）；
+#      --profile 可以输出各计算阶段的耗时和缓存命中率。
+# 注意: 本程序仅适用于分析典型的分压偏置晶体管放大电路，不适用于其他复杂电路或特殊情况。
+# 数据: 晶体管型号参数从同目录下的 晶体管型号库.csv 读取（首次使用时才加载）。
 
-from typing import List, Optional
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from functools import lru_cache, wraps
+import argparse
+import bisect
+import csv
+import heapq
+import json
 import math
+import os
+import sys
+import time
 
 # 定义输入辅助函数
 def get_float_input(prompt: str) -> float:
@@ -57,6 +69,184 @@ def get_yes_no_input(prompt: str, default: str = 'N') -> str:
         else:
             print("输入无效，请输入 'y' 或 'N'。")
 
+# --- 计算核心 ---
+# 以下标量函数是单个电路（各放大电路类）和批量计算（evaluate_batch）共用的计算公式。
+# 它们不输出任何提示信息，只返回计算结果，由调用者决定是否输出警告。
+
+THERMAL_VOLTAGE = 0.026 # 室温下的热电压 Vt (V)
+BOLTZMANN = 1.380649e-23 # 玻尔兹曼常数 (J/K)
+ELECTRON_CHARGE = 1.602176634e-19 # 电子电荷量 (C)
+NOISE_TEMPERATURE = 300.0 # 噪声计算温度 (K)，与 Vt = 26mV 对应
+FLICKER_CORNER = 100.0 # 基极电流 1/f 噪声的典型转折频率 (Hz)
+
+# 直流工作点求解状态
+DC_OK = 'ok'
+DC_NO_BIAS = 'no_bias' # 上下偏置电阻都为无穷大
+DC_CUTOFF = 'cutoff' # 基极电流为负，晶体管截止
+DC_ZERO_DENOMINATOR = 'zero_denominator' # 基极回路方程分母为零
+DC_SHORTED_BIAS = 'shorted_bias' # 上下偏置电阻和为零
+
+DC_STATUS_MESSAGES: Dict[str, str] = {
+    DC_NO_BIAS: "提示：基极等效电阻 Rb 为无穷大，假定 Ib=0, Ic=0, Ie=0, Vb=Vbe, Ve=0, Vce=Vcc。",
+    DC_CUTOFF: "警告：计算得到的基极电流为负，晶体管处于截止状态。",
+    DC_ZERO_DENOMINATOR: "警告：计算基极电流时分母为零，Ib 无法确定。",
+    DC_SHORTED_BIAS: "警告：上下偏置电阻和为零，电路连接不正常，无法计算直流工作点。",
+}
+
+
+def equivalent_resistance(values: List[float], is_parallel: bool) -> float:
+    """计算一组电阻的等效电阻（并联或串联）。"""
+    if not values:
+        return 0.0 if not is_parallel else float('inf') # 并联无电阻为无穷大，串联无电阻为0
+
+    if is_parallel:
+        # 计算并联等效电阻
+        sum_reciprocal = sum(1 / r for r in values if r != 0)
+        return 1 / sum_reciprocal if sum_reciprocal != 0.0 else float('inf')
+    # 计算串联等效电阻
+    return sum(values)
+
+
+def parallel_resistance(r1: float, r2: float) -> float:
+    """计算两个电阻的并联值，支持无穷大；任一为 NaN、两者均为无穷大或分母为零时返回 NaN。"""
+    if math.isnan(r1) or math.isnan(r2) or (math.isinf(r1) and math.isinf(r2)):
+        return float('nan')
+    # 处理无穷大的并联
+    if math.isinf(r1):
+        return r2
+    if math.isinf(r2):
+        return r1
+    if (r1 + r2) != 0.0:
+        return (r1 * r2) / (r1 + r2)
+    return float('nan') # 分母为零
+
+
+def bias_resistance(rb_up_eq: float, rb_down_eq: float) -> float:
+    """计算交流通路下的基极等效电阻（上下偏置电阻并联），两者都为无穷大时结果为无穷大。"""
+    if math.isinf(rb_up_eq) and math.isinf(rb_down_eq):
+        return float('inf')
+    return parallel_resistance(rb_up_eq, rb_down_eq)
+
+
+def solve_dc_operating_point(vcc: float, rb_up_eq: float, rb_down_eq: float, rc_eq: float, re_dc_eq: float,
+                             beta: float, vbe: float) -> Tuple[float, float, float, float, float, float, str]:
+    """使用戴维宁定理求解直流工作点，返回 (Vb, Ve, Ib, Ic, Ie, Vce, 求解状态)。"""
+    nan = float('nan')
+
+    if math.isinf(rb_up_eq) and math.isinf(rb_down_eq):
+        # 没有偏置电阻，基极电流 Ib 趋近于 0。
+        ib = ie = ic = 0.0
+        ve = ie * re_dc_eq # Ie = 0 导致 Ve = 0
+        vb = ve + vbe # Vb = Vbe
+        vce = vcc - ic * rc_eq - ie * re_dc_eq # Ic = 0, Ie = 0 导致 Vce = Vcc
+        return vb, ve, ib, ic, ie, vce, DC_NO_BIAS
+
+    if (rb_up_eq + rb_down_eq) == 0.0:
+        # 上下偏置电阻都为 0，基极直接短接到 Vcc 和地，电路不正常。
+        return nan, nan, nan, nan, nan, nan, DC_SHORTED_BIAS
+
+    # 计算戴维宁等效电压 Vbb
+    if math.isinf(rb_up_eq):
+        vbb = vcc # 上偏置开路，Vbb 接近 Vcc
+    elif math.isinf(rb_down_eq):
+        vbb = 0.0 # 下偏置开路，Vbb 接近地
+    else:
+        vbb = vcc * (rb_down_eq / (rb_up_eq + rb_down_eq))
+
+    # 计算戴维宁等效电阻 Rbb
+    if math.isinf(rb_up_eq):
+        rbb_eq = rb_down_eq
+    elif math.isinf(rb_down_eq):
+        rbb_eq = rb_up_eq
+    else:
+        rbb_eq = (rb_up_eq * rb_down_eq) / (rb_up_eq + rb_down_eq)
+
+    # 根据基极回路方程计算基极电流 Ib
+    # Vbb - Ib * Rbb - Vbe - (1 + beta) * Ib * Re_dc_eq = 0
+    # Ib = (Vbb - Vbe) / (Rbb + (1 + beta) * Re_dc_eq)
+    denominator = rbb_eq + (1 + beta) * re_dc_eq
+    if denominator == 0.0:
+        return nan, nan, nan, nan, nan, nan, DC_ZERO_DENOMINATOR
+
+    status = DC_OK
+    ib = (vbb - vbe) / denominator
+    if ib < 0:
+        ib = 0.0 # 基极电流不能为负，表示晶体管截止
+        status = DC_CUTOFF
+
+    # 计算其他直流参数（Ib 为 NaN 时结果也都为 NaN）
+    ie = (1 + beta) * ib
+    ic = beta * ib
+    ve = ie * re_dc_eq
+    vb = ve + vbe
+    vce = vcc - ic * rc_eq - ie * re_dc_eq
+    return vb, ve, ib, ic, ie, vce, status
+
+
+def calculate_rbe_value(rbb_prime: float, beta: float, ic_ma: float) -> float:
+    """计算交流输入电阻 rbe = rbb' + (1 + beta) * (Vt / Ic) (kOhm)，Ic 无效时返回无穷大。"""
+    if ic_ma > 0.0 and not math.isinf(ic_ma) and not math.isnan(ic_ma):
+        return rbb_prime + (1 + beta) * (THERMAL_VOLTAGE / ic_ma)
+    return float('inf') # 如果 Ic <= 0 或无穷大/NaN，rbe 趋近无穷大
+
+
+# 交流公式（各组态共用同一参数表，便于批量计算按组态分组调用）
+# 参数: beta, rbe, 交流基极等效电阻 Rb_eq, Rc_eq, Re_dc_eq, Re_ac_eq, RL
+# 返回: (交流负载电阻 RoSum, 电压增益 Au, 输入电阻 Ri, 输出电阻 Ro)
+ACResult = Tuple[float, float, float, float]
+
+
+def common_emitter_ac(beta: float, rbe: float, rb_eq: float, rc_eq: float, re_dc_eq: float,
+                      re_ac_eq: float, rl: float) -> ACResult:
+    """共射极放大电路的交流小信号参数。"""
+    # 交流负载电阻 RoSum = Rc // RL
+    ro_sum = parallel_resistance(rc_eq, rl)
+    # Au = - beta * RoSum / (rbe + (1 + beta) * Re_ac_eq)
+    au_denominator = rbe + (1 + beta) * re_ac_eq
+    if not math.isnan(ro_sum) and not math.isinf(au_denominator) and au_denominator != 0.0:
+        au = -(beta * ro_sum) / au_denominator
+    else:
+        au = float('nan') # 分母为零 或无穷大，或 RoSum 为 NaN
+    # Ri = Rb_eq // (rbe + (1 + beta) * Re_ac_eq)
+    ri = parallel_resistance(rb_eq, au_denominator)
+    # Ro = Rc_eq (不考虑晶体管输出电阻 ro)
+    return ro_sum, au, ri, rc_eq
+
+
+def common_collector_ac(beta: float, rbe: float, rb_eq: float, rc_eq: float, re_dc_eq: float,
+                        re_ac_eq: float, rl: float) -> ACResult:
+    """共集电极放大电路（射极跟随器）的交流小信号参数，假定信号源内阻为零。"""
+    # 交流负载电阻 RoSum = Re // RL（负载接在发射极）
+    ro_sum = parallel_resistance(re_dc_eq, rl)
+    # Au = (1 + beta) * RoSum / (rbe + (1 + beta) * RoSum)
+    au_denominator = rbe + (1 + beta) * ro_sum
+    if not math.isnan(ro_sum) and not math.isinf(au_denominator) and au_denominator != 0.0:
+        au = (1 + beta) * ro_sum / au_denominator
+    else:
+        au = float('nan')
+    # Ri = Rb_eq // (rbe + (1 + beta) * RoSum)
+    ri = parallel_resistance(rb_eq, au_denominator)
+    # Ro = Re // (rbe / (1 + beta))
+    ro = parallel_resistance(re_dc_eq, rbe / (1 + beta)) if (1 + beta) != 0.0 else float('nan')
+    return ro_sum, au, ri, ro
+
+
+def common_base_ac(beta: float, rbe: float, rb_eq: float, rc_eq: float, re_dc_eq: float,
+                   re_ac_eq: float, rl: float) -> ACResult:
+    """共基极放大电路的交流小信号参数，假定基极交流接地（偏置电阻被电容旁路）。"""
+    # 交流负载电阻 RoSum = Rc // RL
+    ro_sum = parallel_resistance(rc_eq, rl)
+    # Au = beta * RoSum / rbe
+    if not math.isnan(ro_sum) and not math.isinf(rbe) and rbe != 0.0:
+        au = beta * ro_sum / rbe
+    else:
+        au = float('nan')
+    # Ri = Re // (rbe / (1 + beta))
+    ri = parallel_resistance(re_dc_eq, rbe / (1 + beta)) if (1 + beta) != 0.0 else float('nan')
+    # Ro = Rc_eq (不考虑晶体管输出电阻 ro)
+    return ro_sum, au, ri, rc_eq
+
+
 class Resistor:
     """表示电阻或电阻组合的类。"""
     def __init__(self, name: str, values: Optional[List[float]] = None, is_parallel: bool = True):
@@ -67,18 +257,7 @@ class Resistor:
 
     def calculate_equivalent(self) -> float:
         """计算电阻组合的等效电阻。"""
-        if not self.values:
-            self.equivalent_value = 0.0 if not self.is_parallel else float('inf') # 并联无电阻为无穷大，串联无电阻为0
-            return self.equivalent_value
-
-        if self.is_parallel:
-            # 计算并联等效电阻
-            sum_reciprocal = sum(1 / r for r in self.values if r != 0)
-            self.equivalent_value = 1 / sum_reciprocal if sum_reciprocal != 0.0 else float('inf')
-        else:
-            # 计算串联等效电阻
-            self.equivalent_value = sum(self.values)
-
+        self.equivalent_value = equivalent_resistance(self.values, self.is_parallel)
         return self.equivalent_value
 
     def get_input(self):
@@ -106,6 +285,273 @@ class Resistor:
                      self.equivalent_value = 0.0
                      print(f"提示：没有输入 '{self.name}' 电阻，假定等效电阻为 0。")
 
+# --- 标准电阻组合 ---
+# 用 E 系列标准电阻的串联或并联凑出任意目标阻值。两个电阻的组合预先算好并排序（按系列和数量级缓存），
+# 三个、四个电阻的组合用“单个 + 一对”“一对 + 一对”的折半查找（meet-in-the-middle），不需要穷举。
+
+E24_BASE = (1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
+            3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1)
+
+
+def e_series_base(series: str) -> Tuple[float, ...]:
+    """返回 E 系列在一个数量级内的标准值（1.0 ~ 9.x）。"""
+    series = series.upper()
+    if series in ('E3', 'E6', 'E12', 'E24'):
+        return E24_BASE[::24 // int(series[1:])]
+    if series in ('E48', 'E96', 'E192'):
+        n = int(series[1:])
+        values = [round(10 ** (i / n), 2) for i in range(n)]
+        if n == 192:
+            values[185] = 9.20 # E192 中唯一与公式计算结果不同的值（9.19 -> 9.20）
+        return tuple(values)
+    raise ValueError(f"未知的 E 系列 '{series}'，应为 E3、E6、E12、E24、E48、E96 或 E192。")
+
+
+class ResistorCombination(NamedTuple):
+    """一个标准电阻组合：values 中的电阻全部串联或全部并联。"""
+    values: Tuple[float, ...] # 各电阻阻值 (kOhm)
+    is_parallel: bool
+    equivalent: float # 等效电阻 (kOhm)
+    error: float # 相对误差 (equivalent - target) / target
+
+    def to_resistor(self, name: str) -> Resistor:
+        """转换为 Resistor 对象。"""
+        return Resistor(name, values=list(self.values), is_parallel=self.is_parallel)
+
+
+@lru_cache(maxsize=64)
+def _combination_tables(series: str, decade_lo: int, decade_hi: int, parallel: bool):
+    """某 E 系列在 [10^decade_lo, 10^(decade_hi + 1)) kOhm 范围内的标准值及两两组合表。
+
+    串联时表中存阻值，并联时存电导 (1/kOhm)，两种情况都是“各电阻的量相加”。
+    返回 (单个电阻的量（升序）, 对应阻值, 两两组合之和（升序）, 对应的 (i, j) 下标)。
+    """
+    resistances = sorted(round(base * 10 ** decade, 9)
+                         for decade in range(decade_lo, decade_hi + 1) for base in e_series_base(series))
+    if parallel:
+        resistances.reverse() # 电导升序
+    singles = [1 / r if parallel else r for r in resistances]
+    index = [(i, j) for i in range(len(singles)) for j in range(i, len(singles))]
+    sums = [singles[i] + singles[j] for i, j in index]
+    order = sorted(range(len(sums)), key=sums.__getitem__)
+    return singles, resistances, [sums[k] for k in order], [index[k] for k in order]
+
+
+def _outward(sorted_values: List[float], target: float, within: Callable[[float], bool], lo: int = 0):
+    """从有序列表中（下标 lo 之后）最接近 target 的位置向两侧交替移动，按距离由近到远产生下标。
+
+    某一侧的值不再满足 within 时停止该侧；within 在每一步重新判断，因此可以随误差上限收紧而提前结束。
+    """
+    left = bisect.bisect_left(sorted_values, target, lo)
+    right = left
+    left -= 1
+    while True:
+        left_ok = left >= lo and within(sorted_values[left])
+        right_ok = right < len(sorted_values) and within(sorted_values[right])
+        if left_ok and (not right_ok or target - sorted_values[left] <= sorted_values[right] - target):
+            yield left
+            left -= 1
+        elif right_ok:
+            yield right
+            right += 1
+        else:
+            return
+
+
+def find_resistor_combinations(target: float, tolerance: float = 0.01, series: str = 'E24', max_parts: int = 3,
+                               limit: int = 10, span: int = 3) -> List[ResistorCombination]:
+    """查找由最多 max_parts 个 E 系列标准电阻串联或并联组成、误差不超过 tolerance 的组合。
+
+    target 单位为 kOhm。串联只使用不大于目标值、且不小于目标值 10^-span 倍的电阻，并联只使用不小于目标值、
+    且不大于目标值 10^span 倍的电阻。结果按电阻数量、误差绝对值排序，最多返回 limit 个
+    （电阻较少的组合已经够 limit 个时不再查找更多电阻的组合）；
+    不包括串并联混合的组合（Resistor 只能表示全部串联或全部并联）。
+    """
+    if not target > 0.0 or math.isinf(target):
+        raise ValueError(f"目标阻值必须是正的有限值，当前为 {target}。")
+    if not 1 <= max_parts <= 4:
+        raise ValueError(f"电阻数量上限必须在 1 到 4 之间，当前为 {max_parts}。")
+    decade = math.floor(math.log10(target))
+    tables = {False: _combination_tables(series, decade - span, decade, False),
+              True: _combination_tables(series, decade, decade + span, True)}
+    goals = {False: target, True: 1 / target}
+    results: List[ResistorCombination] = []
+
+    # 结果按电阻数量排序，所以从 1 个电阻开始逐级查找，凑够 limit 个结果后就不再查找更多电阻的组合
+    for parts in range(1, max_parts + 1):
+        needed = limit - len(results)
+        level: Dict[Tuple[Tuple[float, ...], bool], ResistorCombination] = {}
+        worst: List[Tuple[float, Tuple[Tuple[float, ...], bool]]] = [] # 当前保留结果的最大堆（误差取负）
+        bound = tolerance * target # 允许的最大误差，保留的结果够 needed 个后收紧为其中最大的误差
+
+        def in_bound(total: float) -> bool:
+            # 表中的和（串联为阻值，并联为电导）对应的等效电阻是否在当前误差上限以内
+            return abs((1 / total if parallel else total) - target) <= bound
+
+        def total_window() -> Tuple[float, float]:
+            # 当前误差上限对应的表中和的范围（略微放宽，精确判断仍由 consider 完成）
+            if parallel:
+                return (1 / (target + bound) * (1 - 1e-12),
+                        1 / (target - bound) * (1 + 1e-12) if target > bound else float('inf'))
+            return (target - bound) * (1 - 1e-12), (target + bound) * (1 + 1e-12)
+
+        def consider(indices: Tuple[int, ...], total: float, resistances: List[float]):
+            nonlocal bound
+            # 先用表中的和判断误差，只有足够好的组合才整理成结果
+            if not in_bound(total):
+                return
+            values = tuple(sorted(resistances[i] for i in indices))
+            key = (values, parallel)
+            if key in level:
+                return
+            equivalent = equivalent_resistance(list(values), parallel)
+            level[key] = ResistorCombination(values, parallel, equivalent, (equivalent - target) / target)
+            heapq.heappush(worst, (-abs(equivalent - target), key))
+            if len(worst) > needed:
+                del level[heapq.heappop(worst)[1]]
+            if len(worst) == needed:
+                bound = -worst[0][0]
+
+        # 表中的值有序，且离目标越远误差越大，所以从最接近目标的位置向两侧查找，直到超出误差上限
+        for parallel in (False, True):
+            singles, resistances, pair_sums, pair_index = tables[parallel]
+            goal = goals[parallel]
+            if parts == 1:
+                # 1 个电阻：串联、并联结果相同，只查一次
+                if not parallel:
+                    for i in _outward(singles, goal, in_bound):
+                        consider((i,), singles[i], resistances)
+            elif parts == 2:
+                # 2 个电阻：直接查两两组合表
+                for k in _outward(pair_sums, goal, in_bound):
+                    consider(pair_index[k], pair_sums[k], resistances)
+            elif parts == 3:
+                # 3 个电阻：单个 + 一对。单个电阻从小到大，加上最小的一对也超出上限后不再继续
+                for i, single in enumerate(singles):
+                    if single + pair_sums[0] > goal and not in_bound(single + pair_sums[0]):
+                        break
+                    for j in _outward(pair_sums, goal - single, lambda v: in_bound(single + v)):
+                        consider((i,) + pair_index[j], single + pair_sums[j], resistances)
+            else:
+                # 4 个电阻：一对 + 一对（第一对不大于第二对）。外层按第二对从小到大扫描，它的和在目标的一半到目标之间，
+                # 比第一对的取值少得多；剩余量随之递减，第一对在表中的位置 k 只向下移动（双指针，
+                # 每次在 k 以下折半查找新位置），再从 k 向两侧扩展到超出误差范围为止
+                total_lo, total_hi = total_window()
+                first_k2 = bisect.bisect_left(pair_sums, total_lo / 2)
+                k = len(pair_sums)
+                for k2 in range(first_k2, bisect.bisect_right(pair_sums, total_hi)):
+                    second = pair_sums[k2]
+                    residual = goal - second
+                    k = bisect.bisect_left(pair_sums, residual, 0, k)
+                    j = k
+                    while j <= k2 and second + pair_sums[j] <= total_hi:
+                        consider(pair_index[j] + pair_index[k2], second + pair_sums[j], resistances)
+                        total_lo, total_hi = total_window()
+                        j += 1
+                    j = (k if k <= k2 else k2 + 1) - 1
+                    while j >= 0 and second + pair_sums[j] >= total_lo:
+                        consider(pair_index[j] + pair_index[k2], second + pair_sums[j], resistances)
+                        total_lo, total_hi = total_window()
+                        j -= 1
+
+        results.extend(sorted(level.values(), key=lambda c: abs(c.error)))
+        if len(results) >= limit:
+            break
+    return results[:limit]
+
+
+class TransistorPart(NamedTuple):
+    """型号库中的一条晶体管记录（范围字段可直接用于容差分析）。"""
+    part: str
+    polarity: str
+    material: str
+    beta_min: float
+    beta_typ: float
+    beta_max: float
+    vbe_min: float
+    vbe_typ: float
+    vbe_max: float
+    rbb: float # rbb' (kOhm)
+    cmu: float # Cμ (pF)
+    cpi: float # Cπ (pF)
+    va: float # 厄利电压 (V)
+
+    @property
+    def beta_corners(self) -> Tuple[float, float, float]:
+        """返回 (最小, 典型, 最大) beta。"""
+        return (self.beta_min, self.beta_typ, self.beta_max)
+
+    @property
+    def vbe_corners(self) -> Tuple[float, float, float]:
+        """返回 (最小, 典型, 最大) Vbe。"""
+        return (self.vbe_min, self.vbe_typ, self.vbe_max)
+
+
+class TransistorLibrary:
+    """按型号和前缀索引的晶体管型号库，首次查询时才读取数据文件。"""
+    def __init__(self, path: str):
+        self.path = path
+        self._parts: Optional[Dict[str, TransistorPart]] = None
+        self._sorted_names: List[str] = []
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """统一型号写法（去除空白、转为大写）。"""
+        return name.strip().upper()
+
+    def _load(self) -> Dict[str, TransistorPart]:
+        """读取数据文件并建立索引，仅执行一次。"""
+        if self._parts is None:
+            parts: Dict[str, TransistorPart] = {}
+            with open(self.path, encoding='utf-8', newline='') as f:
+                rows = csv.DictReader(line for line in f if line.strip() and not line.startswith('#'))
+                for row in rows:
+                    name = self.normalize(row['part'])
+                    parts[name] = TransistorPart(
+                        part=name,
+                        polarity=row['polarity'],
+                        material=row['material'],
+                        **{field: float(row[field]) for field in TransistorPart._fields[3:]}
+                    )
+            self._sorted_names = sorted(parts)
+            self._parts = parts
+        return self._parts
+
+    def get(self, name: str) -> TransistorPart:
+        """按型号精确查询，型号不存在时抛出 KeyError。"""
+        parts = self._load()
+        key = self.normalize(name)
+        if key not in parts:
+            raise KeyError(f"型号库中没有晶体管 '{name}'。")
+        return parts[key]
+
+    def find(self, prefix: str) -> List[TransistorPart]:
+        """按型号前缀查询，返回按型号排序的记录列表。"""
+        parts = self._load()
+        key = self.normalize(prefix)
+        start = bisect.bisect_left(self._sorted_names, key)
+        result = []
+        for name in self._sorted_names[start:]:
+            if not name.startswith(key):
+                break
+            result.append(parts[name])
+        return result
+
+    def names(self) -> List[str]:
+        """返回型号库中的全部型号。"""
+        self._load()
+        return list(self._sorted_names)
+
+
+# 默认型号库文件与本程序位于同一目录
+TRANSISTOR_LIBRARY = TransistorLibrary(os.path.join(os.path.dirname(os.path.abspath(__file__)), "晶体管型号库.csv"))
+
+
+@lru_cache(maxsize=256)
+def lookup_transistor_part(name: str) -> TransistorPart:
+    """从默认型号库查询晶体管型号（结果带缓存，批量计算时重复型号不会重复查找）。"""
+    return TRANSISTOR_LIBRARY.get(name)
+
 
 class Transistor:
     """表示晶体管的类。"""
@@ -114,23 +560,95 @@ class Transistor:
         self.vbe: float = 0.0
         self.rbb_prime: float = 0.0
         self.rbe: float = float('inf') # 交流输入电阻
+        self.part: Optional[TransistorPart] = None # 来自型号库时的完整记录
+        self.cmu: float = float('nan') # Cμ (pF)
+        self.cpi: float = float('nan') # Cπ (pF)
+        self.va: float = float('inf') # 厄利电压 (V)
+
+    @classmethod
+    def from_part(cls, name: Union[str, TransistorPart], corner: str = 'typ') -> 'Transistor':
+        """根据型号库中的型号创建晶体管，corner 为 'min'、'typ' 或 'max'，决定 beta 和 Vbe 的取值。"""
+        part = name if isinstance(name, TransistorPart) else lookup_transistor_part(name)
+        transistor = cls()
+        transistor.set_part(part, corner)
+        return transistor
+
+    def set_part(self, part: TransistorPart, corner: str = 'typ'):
+        """使用型号库记录设置晶体管参数。"""
+        if corner not in ('min', 'typ', 'max'):
+            raise ValueError(f"无效的参数取值 '{corner}'，应为 'min'、'typ' 或 'max'。")
+        self.part = part
+        self.beta = getattr(part, f"beta_{corner}")
+        self.vbe = getattr(part, f"vbe_{corner}")
+        self.rbb_prime = part.rbb
+        self.cmu = part.cmu
+        self.cpi = part.cpi
+        self.va = part.va
+
+    @classmethod
+    def from_spec(cls, spec: Union[str, dict]) -> 'Transistor':
+        """根据批量文件中的描述创建晶体管。
+
+        spec 可以是型号字符串（如 "2N3904"），也可以是字典：
+        {"part": "BC547B", "corner": "min"} 或 {"beta": 100, "vbe": 0.6, "rbb": 0.2}。
+        字典中显式给出的 beta/vbe/rbb 会覆盖型号库中的值。
+        """
+        if isinstance(spec, str):
+            return cls.from_part(spec)
+        if 'part' in spec:
+            transistor = cls.from_part(spec['part'], spec.get('corner', 'typ'))
+        else:
+            transistor = cls()
+        if 'beta' in spec:
+            transistor.beta = float(spec['beta'])
+        if 'vbe' in spec:
+            transistor.vbe = float(spec['vbe'])
+        if 'rbb' in spec:
+            transistor.rbb_prime = float(spec['rbb'])
+        return transistor
+
+    def get_part_input(self):
+        """从型号库中选择晶体管型号。"""
+        while True:
+            name = input("请输入晶体管型号（可只输入前缀）：").strip()
+            matches = TRANSISTOR_LIBRARY.find(name) if name else []
+            exact = [p for p in matches if p.part == TransistorLibrary.normalize(name)]
+            if exact or len(matches) == 1:
+                part = exact[0] if exact else matches[0]
+                break
+            elif matches:
+                print("匹配到多个型号：" + "、".join(p.part for p in matches))
+            else:
+                print("型号库中没有匹配的型号，请重新输入。")
+        self.set_part(part)
+        print(f"已选择 {part.part}（{part.polarity}，{part.material}）：beta = {part.beta_typ:g}"
+              f"（{part.beta_min:g} ~ {part.beta_max:g}），Vbe = {part.vbe_typ:g} V，rbb' = {part.rbb:g} kOhm")
 
     def get_dc_parameters_input(self):
-        """获取晶体管直流参数输入。"""
+        """获取晶体管直流参数输入（提示顺序与原来相同，已有的应答脚本仍然可用）。"""
         self.beta = get_float_input("beta = ")
         while True:
-            transistor_type = get_int_input("请输入晶体管的种类（硅管 ： 1 锗管 ： 2）：")
+            transistor_type = get_int_input("请输入晶体管的种类（硅管 ： 1 锗管 ： 2 从型号库选择 ： 3）：")
             if transistor_type == 1:
                 self.vbe = 0.6 # 硅管 Vbe 压降
                 break
             elif transistor_type == 2:
                 self.vbe = 0.2 # 锗管 Vbe 压降
                 break
+            elif transistor_type == 3:
+                typed_beta = self.beta
+                self.get_part_input() # 型号库中的 beta 和 Vbe 取代上面输入的 beta
+                if typed_beta != self.beta:
+                    print(f"提示：输入的 beta = {typed_beta:g} 已被型号库中的典型值 {self.beta:g} 取代。")
+                break
             else:
-                print("输入无效，请重新输入 1 或 2。")
+                print("输入无效，请重新输入 1、2 或 3。")
 
     def get_ac_parameters_input(self):
         """获取晶体管交流参数输入。"""
+        if self.part is not None:
+            print(f"使用型号库中的 rbb' = {self.rbb_prime:g} kOhm")
+            return
         self.rbb_prime = get_float_input("rbb'(kOhm)(// 10 ^ 3) = ")
 
     def calculate_rbe(self, ic_ma: float):
@@ -139,24 +657,28 @@ class Transistor:
         # 其中 Vt 是热电压，约等于 26mV (0.026V) 在室温下。
         # 注意：Ic 单位为 mA，Vt 单位为 V，rbe 单位为 kOhm。
         # 0.026V / Ic(mA) 得到的结果单位是 kOhm。
-        vt = 0.026
-        if ic_ma > 0.0 and not math.isinf(ic_ma) and not math.isnan(ic_ma):
-             self.rbe = self.rbb_prime + (1 + self.beta) * (vt / ic_ma)
-        else:
-             self.rbe = float('inf') # 如果 Ic <= 0 或无穷大/NaN，rbe 趋近无穷大
+        self.rbe = calculate_rbe_value(self.rbb_prime, self.beta, ic_ma)
+        if not (ic_ma > 0.0 and not math.isinf(ic_ma) and not math.isnan(ic_ma)):
              print("警告：直流集电极电流 Ic 小于等于零、无穷大或无法确定，交流输入电阻 rbe 趋近无穷大。")
 
 
-class CommonEmitterAmplifier:
-    """表示共射极放大电路的类。"""
+class TransistorAmplifier:
+    """三种基本组态放大电路的公共基类：偏置网络和直流工作点相同，只有交流公式不同。"""
+    topology: str = ''
+    display_name: str = ''
+    uses_re_ac: bool = True # 交流特性是否需要发射极交流电阻 Re_ac
+    ac_kernel = staticmethod(common_emitter_ac)
+    # 各电阻的连接方式（True 表示并联，False 表示串联），决定没有输入电阻时的等效值
+    resistor_parallel: Dict[str, bool] = {'rb_up': True, 'rb_down': True, 'rc': True, 're_dc': True, 're_ac': False}
+
     def __init__(self):
         self.vcc: float = 0.0
         self.rl: float = 0.0
-        self.rb_up: Resistor = Resistor("基极上半部分电阻", is_parallel=True)
-        self.rb_down: Resistor = Resistor("基极下半部分电阻", is_parallel=True)
-        self.rc: Resistor = Resistor("集电极电阻", is_parallel=True)
-        self.re_dc: Resistor = Resistor("发射极直流电阻", is_parallel=True)
-        self.re_ac: Resistor = Resistor("发射极交流电阻", is_parallel=False) # 交流通路下发射极电阻通常是串联的
+        self.rb_up: Resistor = Resistor("基极上半部分电阻", is_parallel=self.resistor_parallel['rb_up'])
+        self.rb_down: Resistor = Resistor("基极下半部分电阻", is_parallel=self.resistor_parallel['rb_down'])
+        self.rc: Resistor = Resistor("集电极电阻", is_parallel=self.resistor_parallel['rc'])
+        self.re_dc: Resistor = Resistor("发射极直流电阻", is_parallel=self.resistor_parallel['re_dc'])
+        self.re_ac: Resistor = Resistor("发射极交流电阻", is_parallel=self.resistor_parallel['re_ac']) # 交流通路下发射极电阻通常是串联的
         self.transistor: Transistor = Transistor()
 
         # 直流工作点参数
@@ -166,6 +688,7 @@ class CommonEmitterAmplifier:
         self.ic: float = float('nan')
         self.ie: float = float('nan')
         self.vce: float = float('nan')
+        self.dc_status: str = ''
 
         # 交流特性参数
         self.ro_sum: float = float('nan') # 交流负载电阻
@@ -173,10 +696,29 @@ class CommonEmitterAmplifier:
         self.ri: float = float('nan') # 输入电阻
         self.ro: float = float('nan') # 输出电阻
 
+    @staticmethod
+    def from_dict(spec: dict) -> 'TransistorAmplifier':
+        """根据批量文件中的电路描述创建对应组态的放大电路（不需要任何输入）。
+
+        电路描述示例：
+        {"topology": "ce", "vcc": 12, "transistor": "2N3904", "rl": 10,
+         "rb_up": [47], "rb_down": [10], "rc": [2.2], "re_dc": [1.0], "re_ac": [0.1]}
+        电阻可以写成单个数值、数值列表，或 {"values": [...], "parallel": false}；
+        省略的电阻按交互输入中“没有电阻”的情况处理；电阻单位 kOhm，电压单位 V。
+        """
+        topology, vcc, rl, transistor, resistors = _read_circuit_spec(spec)
+        circuit = AMPLIFIER_TYPES[topology]()
+        circuit.vcc = vcc
+        circuit.rl = rl
+        circuit.transistor = transistor
+        for name, (values, is_parallel) in zip(RESISTOR_FIELDS, resistors):
+            resistor: Resistor = getattr(circuit, name)
+            resistor.values, resistor.is_parallel = values, is_parallel
+        return circuit
 
     def get_parameters_input(self):
         """获取电路所有参数输入。"""
-        print("注意！！！本程序仅适用于晶体管共射放大电路！！！")
+        print(f"注意！！！本程序仅适用于{self.display_name}！！！")
 
         # --- 输入直流参数 ---
         print("\n--- 请输入直流参数 ---")
@@ -206,9 +748,10 @@ class CommonEmitterAmplifier:
         self.re_dc.get_input()
 
 
-    def calculate_dc_operating_point(self):
-        """计算直流工作点。"""
-        print("\n--- 计算直流工作点 ---")
+    def calculate_dc_operating_point(self, verbose: bool = True):
+        """计算直流工作点（戴维宁等效基极回路，见 solve_dc_operating_point）。"""
+        if verbose:
+            print("\n--- 计算直流工作点 ---")
 
         # 计算等效电阻
         rb_up_eq = self.rb_up.calculate_equivalent()
@@ -216,88 +759,11 @@ class CommonEmitterAmplifier:
         rc_eq = self.rc.calculate_equivalent()
         re_dc_eq = self.re_dc.calculate_equivalent()
 
-        # 计算基极电压 Vb
-        # 对于分压偏置电路，Vb = Vcc * (Rb_down_eq / (Rb_up_eq + Rb_down_eq))
-        # 如果只有单个 Rb 接 Vcc，下偏置电阻无穷大，Rb_down_eq / (Rb_up_eq + Rb_down_eq) 趋近于 1，Vb 趋近于 Vcc。
-        # 如果 Rb 无穷大 (没有偏置电阻)，上下偏置电阻都无穷大，Rb_down_eq / (Rb_up_eq + Rb_down_eq) 无法确定。
-        # 采用更通用的方法：根据基极回路方程计算 Ib，然后计算 Vb = Vcc - Ib * Rb_up_eq (如果 Rb_up_eq 有限) 或 Vb = Ib * Rb_down_eq (如果 Rb_down_eq 有限)
-        # 或者直接使用戴维宁定理计算基极等效电压和电阻。
-
-        # 使用戴维宁定理计算基极等效电压 Vbb 和等效电阻 Rbb
-        # Vbb = Vcc * (Rb_down_eq / (Rb_up_eq + Rb_down_eq))
-        # Rbb = Rb_up_eq 并联 Rb_down_eq
-
-        if math.isinf(rb_up_eq) and math.isinf(rb_down_eq):
-            # 没有偏置电阻，Vbb 和 Rbb 无法确定，或取决于信号源内阻。
-            # 假定基极直接连接到信号源，没有偏置电阻。
-            # 这种情况下，简单分析可能不适用，但根据原始代码逻辑，似乎假定了 Ib=0, Ic=0, Vce=Vcc
-            # 在 OOP 版本中，我们尝试更通用的计算。
-            # 如果 Rb 无穷大，基极电流 Ib 趋近于 0。
-            self.ib = 0.0
-            self.ie = 0.0
-            self.ic = 0.0
-            self.ve = self.ie * re_dc_eq # Ie = 0 导致 Ve = 0
-            self.vb = self.ve + self.transistor.vbe # Vb = Vbe
-            self.vce = self.vcc - self.ic * rc_eq - self.ie * re_dc_eq # Ic = 0, Ie = 0 导致 Vce = Vcc
-
-            print("提示：基极等效电阻 Rb 为无穷大，假定 Ib=0, Ic=0, Ie=0, Vb=Vbe, Ve=0, Vce=Vcc。")
-
-        elif (rb_up_eq + rb_down_eq) != 0.0:
-             # 计算戴维宁等效电压 Vbb
-             if math.isinf(rb_up_eq):
-                 vbb = self.vcc # 上偏置开路，Vbb 接近 Vcc
-             elif math.isinf(rb_down_eq):
-                 vbb = 0.0 # 下偏置开路，Vbb 接近地
-             else:
-                 vbb = self.vcc * (rb_down_eq / (rb_up_eq + rb_down_eq))
-
-             # 计算戴维宁等效电阻 Rbb
-             if math.isinf(rb_up_eq):
-                 rbb_eq = rb_down_eq
-             elif math.isinf(rb_down_eq):
-                 rbb_eq = rb_up_eq
-             else:
-                 rbb_eq = (rb_up_eq * rb_down_eq) / (rb_up_eq + rb_down_eq)
-
-             # 根据基极回路方程计算基极电流 Ib
-             # Vbb - Ib * Rbb - Vbe - Ie * Re_dc_eq = 0
-             # Vbb - Ib * Rbb - Vbe - (1 + beta) * Ib * Re_dc_eq = 0
-             # Ib * (Rbb + (1 + beta) * Re_dc_eq) = Vbb - Vbe
-             # Ib = (Vbb - Vbe) / (Rbb + (1 + beta) * Re_dc_eq)
-
-             denominator = rbb_eq + (1 + self.transistor.beta) * re_dc_eq
-             if denominator != 0.0:
-                 self.ib = (vbb - self.transistor.vbe) / denominator
-                 if self.ib < 0:
-                     self.ib = 0.0 # 基极电流不能为负，表示晶体管截止
-                     print("警告：计算得到的基极电流为负，晶体管处于截止状态。")
-             else:
-                 self.ib = float('nan')
-                 print("警告：计算基极电流时分母为零，Ib 无法确定。")
-
-             # 计算其他直流参数
-             if not math.isnan(self.ib):
-                 self.ie = (1 + self.transistor.beta) * self.ib
-                 self.ic = self.transistor.beta * self.ib
-                 self.ve = self.ie * re_dc_eq
-                 self.vb = self.ve + self.transistor.vbe
-                 self.vce = self.vcc - self.ic * rc_eq - self.ie * re_dc_eq
-             else:
-                 self.ie = float('nan')
-                 self.ic = float('nan')
-                 self.ve = float('nan')
-                 self.vb = float('nan')
-                 self.vce = float('nan')
-
-        else:
-             # Rb_up_eq + Rb_down_eq == 0.0，即上下偏置电阻都为 0，基极直接短接到 Vcc 和地，电路不正常。
-             self.ib = float('nan')
-             self.ie = float('nan')
-             self.ic = float('nan')
-             self.ve = float('nan')
-             self.vb = float('nan')
-             self.vce = float('nan')
-             print("警告：上下偏置电阻和为零，电路连接不正常，无法计算直流工作点。")
+        (self.vb, self.ve, self.ib, self.ic, self.ie, self.vce,
+         self.dc_status) = solve_dc_operating_point(self.vcc, rb_up_eq, rb_down_eq, rc_eq, re_dc_eq,
+                                                    self.transistor.beta, self.transistor.vbe)
+        if verbose and self.dc_status in DC_STATUS_MESSAGES:
+            print(DC_STATUS_MESSAGES[self.dc_status])
 
 
     def calculate_ac_characteristics(self):
@@ -311,85 +777,63 @@ class CommonEmitterAmplifier:
             self.transistor.get_ac_parameters_input()
             self.transistor.calculate_rbe(self.ic)
 
-            # 询问交流通路下发射极与公共接地之间是否有电阻
-            re_ac_present = get_yes_no_input("在交流通路下发射极与公共接地之间是否有电阻？（y 或 N）（默认为N）")
-
-            if re_ac_present == 'y':
-                 self.re_ac.get_input()
-                 re_ac_eq = self.re_ac.calculate_equivalent()
-            else:
-                 re_ac_eq = 0.0 # 交流通路下发射极直接接地
-
-            # 计算交流负载电阻 RoSum (集电极电阻 Rc 与负载电阻 Rl 的并联)
-            rc_eq = self.rc.calculate_equivalent()
-            if not (math.isnan(rc_eq) or math.isnan(self.rl) or (math.isinf(rc_eq) and math.isinf(self.rl))):
-                # 处理无穷大的并联
-                if math.isinf(rc_eq):
-                    self.ro_sum = self.rl
-                elif math.isinf(self.rl):
-                    self.ro_sum = rc_eq
-                elif (rc_eq + self.rl) != 0.0:
-                    self.ro_sum = (rc_eq * self.rl) / (rc_eq + self.rl)
+            if self.uses_re_ac:
+                # 询问交流通路下发射极与公共接地之间是否有电阻
+                re_ac_present = get_yes_no_input("在交流通路下发射极与公共接地之间是否有电阻？（y 或 N）（默认为N）")
+                if re_ac_present == 'y':
+                     self.re_ac.get_input()
                 else:
-                    self.ro_sum = float('nan') # 分母为零
-                    print("警告：计算交流负载电阻时分母为零，RoSum 无法确定。")
-            else:
-                self.ro_sum = float('nan')
-                print("警告：集电极电阻 Rc 或负载电阻 Rl 无效，RoSum 无法确定。")
+                     self.re_ac.values = [] # 交流通路下发射极直接接地
 
+            self.compute_ac_characteristics()
 
-            # 计算电压增益 Au
-            # Au = - beta * RoSum / (rbe + (1 + beta) * Re_ac_eq)
-            au_denominator = self.transistor.rbe + (1 + self.transistor.beta) * re_ac_eq
-            if not math.isnan(self.ro_sum) and not math.isinf(au_denominator) and au_denominator != 0.0:
-                self.au = -(self.transistor.beta * self.ro_sum) / au_denominator
-            else:
-                 self.au = float('nan') # 分母为零 或无穷大，或 RoSum 为 NaN
-
-
-            # 计算输入电阻 Ri
-            # Ri = Rb_eq 并联 (rbe + (1 + beta) * Re_ac_eq)
-            # 交流通路下，Rb_up 和 Rb_down 并联作为等效基极电阻
-            rb_up_eq_ac = self.rb_up.calculate_equivalent()
-            rb_down_eq_ac = self.rb_down.calculate_equivalent()
-
-            if not (math.isinf(rb_up_eq_ac) and math.isinf(rb_down_eq_ac)):
-                 if math.isinf(rb_up_eq_ac):
-                      rb_eq_ac = rb_down_eq_ac
-                 elif math.isinf(rb_down_eq_ac):
-                      rb_eq_ac = rb_up_eq_ac
-                 elif (rb_up_eq_ac + rb_down_eq_ac) != 0.0:
-                      rb_eq_ac = (rb_up_eq_ac * rb_down_eq_ac) / (rb_up_eq_ac + rb_down_eq_ac)
-                 else:
-                      rb_eq_ac = float('nan')
-                      print("警告：计算交流基极等效电阻时分母为零，Ri 无法确定。")
-            else:
-                 rb_eq_ac = float('inf') # 上下偏置电阻都无穷大，等效基极电阻无穷大
-
-
-            ri_parallel_term = self.transistor.rbe + (1 + self.transistor.beta) * re_ac_eq
-            if not (math.isnan(rb_eq_ac) or math.isnan(ri_parallel_term) or (math.isinf(rb_eq_ac) and math.isinf(ri_parallel_term))):
-                 # 处理无穷大的并联
-                 if math.isinf(rb_eq_ac):
-                     self.ri = ri_parallel_term
-                 elif math.isinf(ri_parallel_term):
-                     self.ri = rb_eq_ac
-                 elif (rb_eq_ac + ri_parallel_term) != 0.0:
-                     self.ri = (rb_eq_ac * ri_parallel_term) / (rb_eq_ac + ri_parallel_term)
-                 else:
-                     self.ri = float('nan') # 分母为零
-            else:
-                 self.ri = float('nan') # rb_eq_ac 或 ri_parallel_term 为 NaN
-
-
-            # 计算输出电阻 Ro
-            # Ro = RcValue_eq (不考虑晶体管输出电阻 ro)
-            self.ro = rc_eq
+            # 输出计算过程中无法确定的中间结果
+            if math.isnan(self.ro_sum):
+                print("警告：交流负载电阻 RoSum 无法确定（电阻无效或并联分母为零）。")
+            if math.isnan(self.ri) and math.isnan(bias_resistance(self.rb_up.calculate_equivalent(),
+                                                                  self.rb_down.calculate_equivalent())):
+                print("警告：计算交流基极等效电阻时分母为零，Ri 无法确定。")
 
         else:
             print("跳过交流特性计算。")
 
 
+    def compute_ac_characteristics(self):
+        """根据已有的直流工作点和电阻值计算交流特性（不需要任何输入）。"""
+        self.transistor.rbe = calculate_rbe_value(self.transistor.rbb_prime, self.transistor.beta, self.ic)
+        # 交流通路下，Rb_up 和 Rb_down 并联作为等效基极电阻
+        rb_eq_ac = bias_resistance(self.rb_up.calculate_equivalent(), self.rb_down.calculate_equivalent())
+        self.ro_sum, self.au, self.ri, self.ro = self.ac_kernel(
+            self.transistor.beta, self.transistor.rbe, rb_eq_ac, self.rc.calculate_equivalent(),
+            self.re_dc.calculate_equivalent(), self.re_ac.calculate_equivalent(), self.rl)
+
+
+    def calculate_thd(self, amplitudes: List[float], samples: int = 256, cycles: int = 1,
+                      n_harmonics: int = 5) -> List[dict]:
+        """在已计算的工作点附近计算一组输入幅值 (V) 下的谐波失真（见 thd_curve）。"""
+        return thd_curve(self.topology, self.ic, self.vce, self.transistor.beta, self.transistor.rbb_prime,
+                         self.re_ac.calculate_equivalent(), self.ro_sum, amplitudes, samples, cycles, n_harmonics)
+
+
+    def calculate_noise(self, rs_values: List[float], frequencies: List[float],
+                        flicker_corner: float = FLICKER_CORNER) -> Tuple[List[List[float]], List[List[float]]]:
+        """在已计算的工作点上计算噪声密度 (nV/√Hz) 和噪声系数 (dB)（见 noise_grid）。"""
+        rb_eq = bias_resistance(self.rb_up.calculate_equivalent(), self.rb_down.calculate_equivalent())
+        rb_eq, re_ac, rc = _noise_resistances(self.topology, rb_eq, self.rc.calculate_equivalent(),
+                                              self.re_ac.calculate_equivalent())
+        return noise_grid(self.ic, self.transistor.beta, self.transistor.rbb_prime, rb_eq, re_ac, rc,
+                          rs_values, frequencies, flicker_corner)
+
+
+    def to_dict(self) -> dict:
+        """以字典形式返回计算结果（与 evaluate_batch 的输出格式相同）。"""
+        return {
+            'topology': self.topology, 'vb': self.vb, 've': self.ve, 'ib': self.ib, 'ic': self.ic,
+            'ie': self.ie, 'vce': self.vce, 'dc_status': self.dc_status, 'rbe': self.transistor.rbe,
+            'ro_sum': self.ro_sum, 'au': self.au, 'ri': self.ri, 'ro': self.ro,
+        }
+
+
     def print_results(self):
         """输出计算结果。"""
         # 输出直流工作点结果
@@ -412,11 +856,1106 @@ class CommonEmitterAmplifier:
              print(f"输出电阻 Ro = {'NaN' if math.isnan(self.ro) else (f'{self.ro:.4f} kOhm' if not math.isinf(self.ro) else 'Infinity kOhm')}")
 
 
+class CommonEmitterAmplifier(TransistorAmplifier):
+    """表示共射极放大电路的类。"""
+    topology = 'ce'
+    display_name = '晶体管共射放大电路'
+    ac_kernel = staticmethod(common_emitter_ac)
+
+
+class CommonCollectorAmplifier(TransistorAmplifier):
+    """表示共集电极放大电路（射极跟随器）的类，负载接在发射极。"""
+    topology = 'cc'
+    display_name = '晶体管共集电极放大电路（射极跟随器）'
+    uses_re_ac = False
+    ac_kernel = staticmethod(common_collector_ac)
+    # 集电极通常直接接 Vcc，没有输入集电极电阻时按 0 处理
+    resistor_parallel = dict(TransistorAmplifier.resistor_parallel, rc=False)
+
+
+class CommonBaseAmplifier(TransistorAmplifier):
+    """表示共基极放大电路的类，基极交流接地，信号从发射极输入。"""
+    topology = 'cb'
+    display_name = '晶体管共基极放大电路'
+    uses_re_ac = False
+    ac_kernel = staticmethod(common_base_ac)
+
+
+AMPLIFIER_TYPES: Dict[str, type] = {
+    CommonEmitterAmplifier.topology: CommonEmitterAmplifier,
+    CommonCollectorAmplifier.topology: CommonCollectorAmplifier,
+    CommonBaseAmplifier.topology: CommonBaseAmplifier,
+}
+
+# 电路描述中的电阻字段
+RESISTOR_FIELDS = ('rb_up', 'rb_down', 'rc', 're_dc', 're_ac')
+
+# 电路描述中可以省略的字段及其默认值
+SPEC_DEFAULTS: Dict[str, object] = {'topology': 'ce', 'rl': float('inf')}
+
+
+def _parse_resistor_spec(value, default_parallel: bool) -> Tuple[List[float], bool]:
+    """解析电路描述中的电阻字段，返回 (电阻值列表, 是否并联)。"""
+    if value is None:
+        return [], default_parallel
+    if isinstance(value, dict):
+        return [float(v) for v in value.get('values', [])], bool(value.get('parallel', default_parallel))
+    if isinstance(value, (list, tuple)):
+        return [float(v) for v in value], default_parallel
+    return [float(value)], default_parallel
+
+
+def _read_circuit_spec(spec: dict) -> Tuple[str, float, float, Transistor, List[Tuple[List[float], bool]]]:
+    """检查并读取电路描述，返回 (组态, Vcc, RL, 晶体管, 按 RESISTOR_FIELDS 顺序的 (电阻值列表, 是否并联))。"""
+    if not isinstance(spec, dict):
+        raise TypeError(f"电路描述应为 JSON 对象，而不是 {type(spec).__name__}。")
+    if 'error' in spec:
+        raise ValueError(spec['error']) # 读取时已经出错的行
+    topology = spec.get('topology', SPEC_DEFAULTS['topology'])
+    if topology not in AMPLIFIER_TYPES:
+        raise ValueError(f"未知的电路组态 '{topology}'，应为 {'、'.join(sorted(AMPLIFIER_TYPES))} 之一。")
+    transistor = Transistor.from_spec(spec['transistor'])
+    resistor_parallel = AMPLIFIER_TYPES[topology].resistor_parallel
+    resistors = [_parse_resistor_spec(spec.get(name), resistor_parallel[name]) for name in RESISTOR_FIELDS]
+    return topology, float(spec['vcc']), float(spec.get('rl', SPEC_DEFAULTS['rl'])), transistor, resistors
+
+
+# --- 批量计算 ---
+
+def _parse_circuit_spec(spec: dict) -> tuple:
+    """把电路描述解析为批量计算所需的一行数值（与 TransistorAmplifier.from_dict 共用 _read_circuit_spec）。"""
+    topology, vcc, rl, transistor, resistors = _read_circuit_spec(spec)
+    equivalents = [equivalent_resistance(values, is_parallel) for values, is_parallel in resistors]
+    return (topology, vcc, rl, transistor.beta, transistor.vbe, transistor.rbb_prime, *equivalents)
+
+
+def _parse_batch(specs: List[dict]) -> Tuple[List[Optional[dict]], List[tuple], List[int]]:
+    """解析一组电路描述，返回 (结果列表（解析失败处已填入错误信息）, 解析成功的各行数值, 各行在输入中的位置)。
+
+    读取时已经出错的行（iter_batch_file 产生的 {"error": ...}）原样作为结果。
+    """
+    results: List[Optional[dict]] = [None] * len(specs)
+    rows = []
+    positions = []
+    for i, spec in enumerate(specs):
+        if isinstance(spec, dict) and 'error' in spec:
+            results[i] = {'error': spec['error']}
+            continue
+        try:
+            rows.append(_parse_circuit_spec(spec))
+            positions.append(i)
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            results[i] = {'error': f"{type(e).__name__}: {e}"}
+    return results, rows, positions
+
+
+def _evaluate_rows(specs: List[dict], results: List[Optional[dict]], rows: List[tuple], positions: List[int]):
+    """按列计算已解析的电路，并把结果写入 results 的对应位置。"""
+    if not rows:
+        return
+    (topology, vcc, rl, beta, vbe, rbb, rb_up, rb_down, rc, re_dc, re_ac) = (list(col) for col in zip(*rows))
+
+    # 直流工作点与 rbe：所有组态共用
+    dc = list(map(solve_dc_operating_point, vcc, rb_up, rb_down, rc, re_dc, beta, vbe))
+    ic = [point[3] for point in dc]
+    rbe = list(map(calculate_rbe_value, rbb, beta, ic))
+    rb_eq = list(map(bias_resistance, rb_up, rb_down))
+
+    # 交流特性：按组态分组，每组调用一次对应的交流公式
+    groups: Dict[str, List[int]] = {}
+    for j, name in enumerate(topology):
+        groups.setdefault(name, []).append(j)
+    ac: List[Optional[ACResult]] = [None] * len(rows)
+    for name, members in groups.items():
+        kernel = AMPLIFIER_TYPES[name].ac_kernel
+        columns = ([col[j] for j in members] for col in (beta, rbe, rb_eq, rc, re_dc, re_ac, rl))
+        for j, value in zip(members, map(kernel, *columns)):
+            ac[j] = value
+
+    for j, i in enumerate(positions):
+        vb, ve, ib, ic_j, ie, vce, status = dc[j]
+        ro_sum, au, ri, ro = ac[j]
+        result = {
+            'topology': topology[j], 'vb': vb, 've': ve, 'ib': ib, 'ic': ic_j, 'ie': ie, 'vce': vce,
+            'dc_status': status, 'rbe': rbe[j], 'ro_sum': ro_sum, 'au': au, 'ri': ri, 'ro': ro,
+        }
+        if 'id' in specs[i]:
+            result['id'] = specs[i]['id']
+        results[i] = result
+
+
+def evaluate_batch(specs: List[dict]) -> List[dict]:
+    """批量计算一组电路（可混合不同组态），结果顺序与输入顺序一致。
+
+    所有电路的直流工作点和 rbe 按列一次算完，交流特性按组态分组后各调用一次对应的交流公式，
+    不会为每个电路创建对象或输出提示信息。无法解析的电路描述在对应位置返回 {"error": 错误信息}。
+    """
+    results, rows, positions = _parse_batch(specs)
+    _evaluate_rows(specs, results, rows, positions)
+    return results
+
+
+# --- 谐波失真分析 ---
+# 在直流工作点附近用指数模型 ic = Ic * exp(vbe / Vt) 驱动晶体管，输入为整数个周期的正弦波，
+# 对输出波形做 FFT 得到各次谐波幅值和总谐波失真 THD。
+
+VCE_SATURATION = 0.2 # 饱和压降 Vce(sat) (V)，输出摆幅超过它时波形被削顶
+EXP_ARGUMENT_LIMIT = 700.0 # exp(vbe / Vt) 的指数上限（exp 在 709.8 以上溢出），达到时输出早已被削顶
+
+
+@lru_cache(maxsize=16)
+def _fft_twiddles(n: int) -> Tuple[complex, ...]:
+    """长度为 n 的 FFT 旋转因子表（按长度缓存）。"""
+    return tuple(complex(math.cos(-2 * math.pi * k / n), math.sin(-2 * math.pi * k / n)) for k in range(n // 2))
+
+
+def fft(values: List[float]) -> List[complex]:
+    """迭代基-2 FFT，输入长度必须是 2 的幂。"""
+    n = len(values)
+    if n == 0 or n & (n - 1):
+        raise ValueError(f"FFT 的点数必须是 2 的幂，当前为 {n}。")
+    # 位反转重排
+    data = [complex(v) for v in values]
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            data[i], data[j] = data[j], data[i]
+    # 蝶形运算
+    twiddles = _fft_twiddles(n)
+    size = 2
+    while size <= n:
+        half = size // 2
+        step = n // size
+        for start in range(0, n, size):
+            for k in range(half):
+                t = twiddles[k * step] * data[start + k + half]
+                data[start + k + half] = data[start + k] - t
+                data[start + k] += t
+        size *= 2
+    return data
+
+
+@lru_cache(maxsize=16)
+def _unit_sine(samples: int, cycles: int) -> Tuple[float, ...]:
+    """整数个周期的单位正弦采样表（所有电路和幅值共用）。"""
+    return tuple(math.sin(2 * math.pi * cycles * k / samples) for k in range(samples))
+
+
+def simulate_output_waveform(topology: str, ic_q: float, vce_q: float, beta: float, rbb_prime: float,
+                             re_ac_eq: float, ro_sum: float, amplitude: float,
+                             samples: int = 256, cycles: int = 1) -> List[float]:
+    """计算正弦输入（幅值 amplitude, V）下的交流输出电压波形 (V)。
+
+    每个采样点用牛顿法求解输入回路 vin = vbe + ΔIc * ((1 + beta) / beta * Re + rbb' / beta)，
+    其中 Re 为发射极交流电阻（共集电极为 RoSum，共基极为 0），ΔIc = Ic * (exp(vbe / Vt) - 1)。
+    共基极的输入加在发射极上，相当于 vbe = -vin。输出超过 Vce(sat) 的部分被削顶。
+    指数的参数限制在 EXP_ARGUMENT_LIMIT 以内，输入回路电阻为 0 且幅值很大时也不会溢出。
+    """
+    vt = THERMAL_VOLTAGE
+    if topology == 'cc':
+        r_emitter, drive, out_factor = ro_sum, 1.0, (1 + beta) / beta # 输出取发射极电流
+    elif topology == 'cb':
+        r_emitter, drive, out_factor = 0.0, -1.0, -1.0
+    else:
+        r_emitter, drive, out_factor = re_ac_eq, 1.0, -1.0
+    r_loop = (1 + beta) / beta * r_emitter + rbb_prime / beta
+    swing = vce_q - VCE_SATURATION # 集电极-发射极电压减小方向的最大摆幅
+
+    waveform = []
+    x = 0.0
+    for s in _unit_sine(samples, cycles):
+        v = drive * amplitude * s
+        low, high = (v, 0.0) if v < 0.0 else (0.0, v) # vbe 的解一定在 0 和 vin 之间
+        x = min(max(x, low), high)
+        if r_loop == 0.0:
+            x = v
+        else:
+            for _ in range(50):
+                e = math.exp(min(x / vt, EXP_ARGUMENT_LIMIT))
+                f = x + r_loop * ic_q * (e - 1) - v
+                dx = f / (1 + r_loop * ic_q * e / vt)
+                x = min(max(x - dx, low), high)
+                if abs(dx) < 1e-12:
+                    break
+        vo = out_factor * ic_q * (math.exp(min(x / vt, EXP_ARGUMENT_LIMIT)) - 1) * ro_sum
+        # 共射极/共基极输出在集电极，下摆受饱和限制；共集电极输出在发射极，上摆受饱和限制
+        if topology == 'cc':
+            vo = min(vo, swing)
+        else:
+            vo = max(vo, -swing)
+        waveform.append(vo)
+    return waveform
+
+
+def harmonic_distortion(waveform: List[float], cycles: int = 1, n_harmonics: int = 5) -> Tuple[List[float], float]:
+    """对整数个周期的波形做 FFT，返回 (1 ~ n_harmonics 次谐波幅值列表, THD(%))。"""
+    n = len(waveform)
+    spectrum = fft(waveform)
+    harmonics = [2 * abs(spectrum[k * cycles]) / n for k in range(1, n_harmonics + 1) if k * cycles < n // 2]
+    if not harmonics or harmonics[0] == 0.0:
+        return harmonics, float('nan')
+    thd = math.sqrt(sum(h * h for h in harmonics[1:])) / harmonics[0] * 100
+    return harmonics, thd
+
+
+def thd_curve(topology: str, ic_q: float, vce_q: float, beta: float, rbb_prime: float, re_ac_eq: float,
+              ro_sum: float, amplitudes: List[float], samples: int = 256, cycles: int = 1,
+              n_harmonics: int = 5) -> List[dict]:
+    """计算一个电路在一组输入幅值下的 THD，工作点无效时各项结果为 NaN。"""
+    valid = (ic_q > 0.0 and not math.isinf(ic_q) and beta > 0.0 and not math.isnan(vce_q)
+             and not math.isnan(ro_sum) and not math.isinf(ro_sum))
+    curve = []
+    for amplitude in amplitudes:
+        if valid:
+            waveform = simulate_output_waveform(topology, ic_q, vce_q, beta, rbb_prime, re_ac_eq, ro_sum,
+                                                amplitude, samples, cycles)
+            harmonics, thd = harmonic_distortion(waveform, cycles, n_harmonics)
+        else:
+            harmonics, thd = [], float('nan')
+        curve.append({'amplitude': amplitude, 'thd': thd, 'harmonics': harmonics})
+    return curve
+
+
+def thd_sweep(specs: List[dict], amplitudes: List[float], samples: int = 256, cycles: int = 1,
+              n_harmonics: int = 5) -> List[dict]:
+    """批量计算一组电路的 THD-输入幅值曲线。
+
+    返回 evaluate_batch 的结果，每个有效电路额外带有 'thd' 字段（thd_curve 的结果）。
+    """
+    results, rows, positions = _parse_batch(specs)
+    _evaluate_rows(specs, results, rows, positions)
+    _add_thd(results, rows, positions, amplitudes, samples, cycles, n_harmonics)
+    return results
+
+
+def _add_thd(results: List[Optional[dict]], rows: List[tuple], positions: List[int], amplitudes: List[float],
+             samples: int = 256, cycles: int = 1, n_harmonics: int = 5):
+    """为已由 _evaluate_rows 计算过的各行加上 'thd' 字段，不重复计算直流工作点和交流特性。"""
+    for row, i in zip(rows, positions):
+        result = results[i]
+        beta, rbb, re_ac = row[3], row[5], row[10]
+        result['thd'] = thd_curve(result['topology'], result['ic'], result['vce'], beta, rbb, re_ac,
+                                  result['ro_sum'], amplitudes, samples, cycles, n_harmonics)
+
+
+# --- 噪声分析 ---
+# 把晶体管和偏置电阻的噪声折算为输入端的等效电压噪声 en 和电流噪声 in：
+#   en^2 = 4kT(rbb' + Re_ac) + 2qIc / gm^2 + 4kT / Rc / gm^2
+#   in^2 = 2qIb * (1 + fc / f) + 4kT / Rb
+# 信号源内阻为 Rs 时，输入端总噪声 vn^2 = 4kTRs + en^2 + in^2 * Rs^2，噪声系数 NF = 10 lg(vn^2 / 4kTRs)。
+# 只有基极电流的 1/f 噪声（转折频率 fc）与频率有关，其余各项在频率循环外只计算一次。
+
+def noise_grid(ic_ma: float, beta: float, rbb_prime: float, rb_eq: float, re_ac_eq: float, rc_eq: float,
+               rs_values: List[float], frequencies: List[float], flicker_corner: float = FLICKER_CORNER,
+               temperature: float = NOISE_TEMPERATURE) -> Tuple[List[List[float]], List[List[float]]]:
+    """计算输入端等效噪声密度 (nV/√Hz) 和噪声系数 NF (dB)，返回两个 [Rs][频率] 二维列表。
+
+    电阻单位 kOhm，电流单位 mA，频率单位 Hz；Rc 为 0 或无穷大时不计集电极电阻噪声，
+    Rb 为无穷大时不计偏置电阻噪声。工作点无效（Ic <= 0 或 beta <= 0）时结果为 NaN。
+    信号源内阻为负数时抛出 ValueError。
+    """
+    if any(rs < 0.0 for rs in rs_values):
+        raise ValueError("信号源内阻 Rs 不能为负数。")
+    nan = float('nan')
+    if not (ic_ma > 0.0 and not math.isinf(ic_ma) and beta > 0.0):
+        return ([[nan] * len(frequencies) for _ in rs_values], [[nan] * len(frequencies) for _ in rs_values])
+
+    four_kt = 4 * BOLTZMANN * temperature
+    two_q = 2 * ELECTRON_CHARGE
+    ic = ic_ma * 1e-3
+    gm = ic * ELECTRON_CHARGE / (BOLTZMANN * temperature)
+
+    # 与频率和信号源内阻无关的部分
+    en2 = four_kt * (rbb_prime + re_ac_eq) * 1e3 + two_q * ic / gm ** 2
+    if rc_eq > 0.0 and not math.isinf(rc_eq):
+        en2 += four_kt / (rc_eq * 1e3) / gm ** 2
+    in2_white = four_kt / (rb_eq * 1e3) if rb_eq > 0.0 and not math.isinf(rb_eq) else 0.0
+    ib_shot = two_q * ic / beta
+    # 与频率有关的部分只剩基极电流噪声
+    in2_f = [in2_white + ib_shot * (1 + flicker_corner / f) if f > 0.0 else float('inf') for f in frequencies]
+
+    density = []
+    figure = []
+    for rs in rs_values:
+        rs_ohm = rs * 1e3
+        source = four_kt * rs_ohm
+        totals = [source + en2 + in2 * rs_ohm ** 2 for in2 in in2_f]
+        density.append([math.sqrt(vn2) * 1e9 for vn2 in totals])
+        figure.append([10 * math.log10(vn2 / source) if source > 0.0 else float('inf') for vn2 in totals])
+    return density, figure
+
+
+def optimal_noise_current(beta: float, rbb_prime: float, rb_eq: float, re_ac_eq: float, rc_eq: float,
+                          rs: float, frequency: float, ic_candidates: Optional[List[float]] = None,
+                          flicker_corner: float = FLICKER_CORNER) -> Tuple[float, float]:
+    """在一组候选集电极电流 (mA) 中搜索噪声系数最小的偏置电流，返回 (Ic, NF)。
+
+    默认候选值为 1uA ~ 10mA 之间按对数均匀分布的 81 个点。
+    """
+    if ic_candidates is None:
+        ic_candidates = [10 ** (-3 + 4 * k / 80) for k in range(81)]
+    best = (float('nan'), float('inf'))
+    for ic in ic_candidates:
+        nf = noise_grid(ic, beta, rbb_prime, rb_eq, re_ac_eq, rc_eq, [rs], [frequency], flicker_corner)[1][0][0]
+        if nf < best[1]:
+            best = (ic, nf)
+    return best
+
+
+def _noise_resistances(topology: str, rb_eq: float, rc_eq: float, re_ac_eq: float) -> Tuple[float, float, float]:
+    """按组态确定参与噪声计算的 (Rb, Re_ac, Rc)。
+
+    共基极的基极交流接地，偏置电阻和发射极交流电阻不在输入回路中；共集电极的输出取自发射极，不计集电极电阻噪声。
+    """
+    if topology == 'cb':
+        return float('inf'), 0.0, rc_eq
+    if topology == 'cc':
+        return rb_eq, 0.0, float('inf')
+    return rb_eq, re_ac_eq, rc_eq
+
+
+def noise_sweep(specs: List[dict], rs_values: List[float], frequencies: List[float],
+                flicker_corner: float = FLICKER_CORNER) -> List[dict]:
+    """批量计算一组电路的噪声。
+
+    返回 evaluate_batch 的结果，每个有效电路额外带有 'noise' 字段：
+    {"en": [Rs][频率] 噪声密度 (nV/√Hz), "nf": [Rs][频率] 噪声系数 (dB)}。
+    """
+    results, rows, positions = _parse_batch(specs)
+    _evaluate_rows(specs, results, rows, positions)
+    _add_noise(results, rows, positions, rs_values, frequencies, flicker_corner)
+    return results
+
+
+def _add_noise(results: List[Optional[dict]], rows: List[tuple], positions: List[int], rs_values: List[float],
+               frequencies: List[float], flicker_corner: float = FLICKER_CORNER):
+    """为已由 _evaluate_rows 计算过的各行加上 'noise' 字段，不重复计算直流工作点和交流特性。"""
+    for row, i in zip(rows, positions):
+        result = results[i]
+        beta, rbb, rb_eq = row[3], row[5], bias_resistance(row[6], row[7])
+        rb_eq, re_ac, rc = _noise_resistances(result['topology'], rb_eq, row[8], row[10])
+        density, figure = noise_grid(result['ic'], beta, rbb, rb_eq, re_ac, rc, rs_values, frequencies,
+                                     flicker_corner)
+        result['noise'] = {'en': density, 'nf': figure}
+
+
+# --- 流式统计 ---
+# 批量计算或扫描的结果逐批送入 BatchAggregator，只保留固定大小的统计量，不保存结果本身：
+# 均值和方差用 Welford 算法，分位数用相对误差固定的对数分桶草图，分布用固定分箱的直方图。
+# 各统计量都可以合并，多个进程分别统计后合并的结果与单个进程统计全部结果相同。
+
+class RunningStats:
+    """Welford 算法的流式均值/方差，另外统计 NaN 和无穷大的个数。"""
+    def __init__(self):
+        self.count: int = 0 # 有限值的个数
+        self.mean: float = 0.0
+        self.m2: float = 0.0 # 偏差平方和
+        self.minimum: float = float('inf')
+        self.maximum: float = float('-inf')
+        self.nan_count: int = 0
+        self.inf_count: int = 0
+
+    def add(self, x: float):
+        """加入一个值。"""
+        if math.isnan(x):
+            self.nan_count += 1
+            return
+        if math.isinf(x):
+            self.inf_count += 1
+            return
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.minimum = min(self.minimum, x)
+        self.maximum = max(self.maximum, x)
+
+    def merge(self, other: 'RunningStats'):
+        """合并另一个统计结果（Chan 等人的并行方差公式）。"""
+        if other.count:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta * delta * self.count * other.count / total
+            self.count = total
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+        self.nan_count += other.nan_count
+        self.inf_count += other.inf_count
+
+    @property
+    def variance(self) -> float:
+        """样本方差，少于两个值时为 NaN。"""
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    def summary(self) -> dict:
+        """以字典形式返回统计结果。"""
+        return {
+            'count': self.count, 'mean': self.mean if self.count else float('nan'),
+            'std': math.sqrt(self.variance) if self.count > 1 else float('nan'),
+            'min': self.minimum if self.count else float('nan'),
+            'max': self.maximum if self.count else float('nan'),
+            'nan': self.nan_count, 'inf': self.inf_count,
+        }
+
+
+class QuantileSketch:
+    """相对误差为 relative_accuracy 的分位数草图（对数分桶），可以精确合并。
+
+    每个桶覆盖 [gamma^(k-1), gamma^k) 的绝对值范围，正数、负数分别计数。桶数超过 max_buckets 时，
+    绝对值最小的桶被并入相邻的桶，因此内存占用固定，只有极小值附近的分位数会变粗。
+    """
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count: int = 0
+        self.count: int = 0
+
+    def _key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1) # 桶内相对误差最小的代表值
+
+    def _collapse(self, store: Dict[int, int]):
+        """桶数超过上限时，把绝对值最小的桶并入相邻的桶。"""
+        if len(store) > self.max_buckets:
+            keys = sorted(store)
+            excess = keys[:len(keys) - self.max_buckets + 1]
+            store[excess[-1]] += sum(store.pop(k) for k in excess[:-1])
+
+    def add(self, x: float):
+        """加入一个值（NaN 和无穷大不计入）。"""
+        if math.isnan(x) or math.isinf(x):
+            return
+        self.count += 1
+        if x == 0.0:
+            self.zero_count += 1
+            return
+        store = self.positive if x > 0.0 else self.negative
+        key = self._key(abs(x))
+        store[key] = store.get(key, 0) + 1
+        self._collapse(store)
+
+    def merge(self, other: 'QuantileSketch'):
+        """合并另一个草图，两者的 relative_accuracy 必须相同。"""
+        if other.gamma != self.gamma:
+            raise ValueError("只能合并相对误差相同的分位数草图。")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+            self._collapse(mine)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        """返回 q 分位数（0 <= q <= 1）的近似值，没有数据时为 NaN。"""
+        if self.count == 0:
+            return float('nan')
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True): # 负数：绝对值从大到小
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+
+class FixedHistogram:
+    """固定分箱的直方图，另外统计低于下限、高于上限和 NaN 的个数。"""
+    def __init__(self, low: float, high: float, bins: int):
+        if not (high > low and bins > 0):
+            raise ValueError(f"无效的直方图范围 [{low}, {high}) 或分箱数 {bins}。")
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.counts: List[int] = [0] * bins
+        self.underflow: int = 0
+        self.overflow: int = 0
+        self.nan_count: int = 0
+
+    def add(self, x: float):
+        """加入一个值。"""
+        if math.isnan(x):
+            self.nan_count += 1
+        elif x < self.low:
+            self.underflow += 1
+        elif x >= self.high:
+            self.overflow += 1
+        else:
+            self.counts[min(int((x - self.low) / (self.high - self.low) * self.bins), self.bins - 1)] += 1
+
+    def merge(self, other: 'FixedHistogram'):
+        """合并另一个直方图，两者的范围和分箱数必须相同。"""
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("只能合并范围和分箱数相同的直方图。")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.nan_count += other.nan_count
+
+    def summary(self) -> dict:
+        """以字典形式返回直方图。"""
+        return {
+            'low': self.low, 'high': self.high, 'bins': self.bins, 'counts': list(self.counts),
+            'underflow': self.underflow, 'overflow': self.overflow, 'nan': self.nan_count,
+        }
+
+
+def _field_values(record, path: str):
+    """按 'a.b' 形式的路径取出结果中的数值，路径上遇到列表时展开其中每一项。"""
+    values = [record]
+    for name in path.split('.'):
+        expanded = []
+        for value in values:
+            while isinstance(value, list) and value and isinstance(value[0], list):
+                value = [item for sub in value for item in sub]
+            for item in (value if isinstance(value, list) else [value]):
+                if isinstance(item, dict) and name in item:
+                    expanded.append(item[name])
+        values = expanded
+    flat = []
+    for value in values:
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, (int, float)) and not isinstance(item, bool):
+                flat.append(float(item))
+    return flat
+
+
+class _GroupStats:
+    """BatchAggregator 中一个分组的统计量。"""
+    def __init__(self, fields, histograms, relative_accuracy):
+        self.records: int = 0
+        self.errors: int = 0
+        self.status: Dict[str, int] = {}
+        self.moments: Dict[str, RunningStats] = {field: RunningStats() for field in fields}
+        self.sketches: Dict[str, QuantileSketch] = {field: QuantileSketch(relative_accuracy) for field in fields}
+        self.histograms: Dict[str, FixedHistogram] = {field: FixedHistogram(*edges)
+                                                      for field, edges in histograms.items()}
+
+    def merge(self, other: '_GroupStats'):
+        self.records += other.records
+        self.errors += other.errors
+        for status, count in other.status.items():
+            self.status[status] = self.status.get(status, 0) + count
+        for field in self.moments:
+            self.moments[field].merge(other.moments[field])
+            self.sketches[field].merge(other.sketches[field])
+        for field in self.histograms:
+            self.histograms[field].merge(other.histograms[field])
+
+
+class BatchAggregator:
+    """批量计算结果的流式汇总，占用内存与结果数量无关。
+
+    fields 为需要统计均值/方差/分位数的结果字段（可用 'thd.thd'、'noise.nf' 这样的路径统计扫描结果），
+    histograms 为 {字段: (下限, 上限, 分箱数)}，group_by 为分组所用的电路描述字段（如 'transistor'、'vcc'）。
+    """
+    def __init__(self, fields: Tuple[str, ...] = ('ic', 'vce', 'au'),
+                 quantiles: Tuple[float, ...] = (0.05, 0.5, 0.95),
+                 histograms: Optional[Dict[str, Tuple[float, float, int]]] = None,
+                 group_by: Tuple[str, ...] = (), relative_accuracy: float = 0.01):
+        self.fields = tuple(fields)
+        self.quantiles = tuple(quantiles)
+        self.histograms = dict(histograms) if histograms is not None else {'ri': (0.0, 100.0, 50)}
+        self.group_by = tuple(group_by)
+        self.relative_accuracy = relative_accuracy
+        self.groups: Dict[str, _GroupStats] = {}
+
+    def _group_key(self, spec: dict) -> str:
+        # 省略的字段按默认值分组（例如没有 topology 的电路归入 "ce"）
+        if not self.group_by:
+            return 'all'
+        return json.dumps([spec.get(name, SPEC_DEFAULTS.get(name)) for name in self.group_by],
+                          ensure_ascii=False, sort_keys=True)
+
+    def add(self, spec: dict, result: dict):
+        """加入一个电路描述及其结果。"""
+        key = self._group_key(spec) if isinstance(spec, dict) and 'error' not in spec else 'invalid'
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = _GroupStats(self.fields, self.histograms, self.relative_accuracy)
+        group.records += 1
+        if 'error' in result:
+            group.errors += 1
+            return
+        status = result.get('dc_status', '')
+        group.status[status] = group.status.get(status, 0) + 1
+        for field in self.fields:
+            for value in _field_values(result, field):
+                group.moments[field].add(value)
+                group.sketches[field].add(value)
+        for field, histogram in group.histograms.items():
+            for value in _field_values(result, field):
+                histogram.add(value)
+
+    def add_batch(self, specs: List[dict], results: List[dict]):
+        """加入一批电路描述及其结果。"""
+        for spec, result in zip(specs, results):
+            self.add(spec, result)
+
+    def merge(self, other: 'BatchAggregator'):
+        """合并另一个汇总（例如其他进程的部分结果），两者的设置必须相同。"""
+        if (other.fields, other.histograms, other.group_by) != (self.fields, self.histograms, self.group_by):
+            raise ValueError("只能合并设置相同的汇总。")
+        for key, group in other.groups.items():
+            if key not in self.groups: # 合并到新的统计量中，不与 other 共用对象
+                self.groups[key] = _GroupStats(self.fields, self.histograms, self.relative_accuracy)
+            self.groups[key].merge(group)
+
+    def summary(self) -> dict:
+        """以字典形式返回各分组的汇总结果。"""
+        summary = {}
+        for key, group in sorted(self.groups.items()):
+            fields = {}
+            for field in self.fields:
+                stats = group.moments[field].summary()
+                stats['quantiles'] = {f"p{q * 100:g}": group.sketches[field].quantile(q) for q in self.quantiles}
+                fields[field] = stats
+            summary[key] = {
+                'group': dict(zip(self.group_by, json.loads(key))) if self.group_by and key != 'invalid' else {},
+                'records': group.records, 'errors': group.errors, 'dc_status': dict(group.status),
+                'fields': fields,
+                'histograms': {field: histogram.summary() for field, histogram in group.histograms.items()},
+            }
+        return summary
+
+
+# --- 性能剖析 ---
+# PROFILER.enable() 把各计算阶段的函数和方法替换为计时包装，disable() 再换回原函数，
+# 因此不开启剖析时调用路径与没有插桩时完全相同，没有任何额外开销。
+# 各阶段的耗时包含其中嵌套调用的其他阶段，例如 amplifier.dc 包含 dc_solve 和 resistor_reduction。
+
+# 剖析的模块级函数：(阶段名, 函数名, 处理条目数对应的参数名（多个时取长度之积，为空时每次调用计 1 条）)
+PROFILED_FUNCTIONS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ('resistor_reduction', 'equivalent_resistance', ()),
+    ('resistor_reduction', 'bias_resistance', ()),
+    ('dc_solve', 'solve_dc_operating_point', ()),
+    ('rbe', 'calculate_rbe_value', ()),
+    ('batch.parse', '_parse_batch', ('specs',)),
+    ('batch.evaluate', '_evaluate_rows', ('rows',)),
+    ('thd', 'thd_curve', ('amplitudes',)),
+    ('noise', 'noise_grid', ('rs_values', 'frequencies')),
+    ('format', 'format_result', ()),
+)
+
+# 剖析的放大电路方法：(阶段名, 方法名)；各组态的交流公式另以 ac.<组态> 为阶段名剖析
+PROFILED_METHODS: Tuple[Tuple[str, str], ...] = (
+    ('amplifier.dc', 'calculate_dc_operating_point'),
+    ('amplifier.ac', 'compute_ac_characteristics'),
+    ('amplifier.print', 'print_results'),
+)
+
+# 统计命中率的缓存函数
+PROFILED_CACHES: Tuple[str, ...] = ('lookup_transistor_part', '_combination_tables', '_fft_twiddles', '_unit_sine')
+
+
+class _StageCounter:
+    """单个阶段的调用次数、累计耗时 (ns) 和处理条目数。"""
+    __slots__ = ('calls', 'ns', 'items')
+
+    def __init__(self):
+        self.calls: int = 0
+        self.ns: int = 0
+        self.items: int = 0
+
+
+class Profiler:
+    """计算流程的计时钩子：按阶段统计调用次数、耗时和处理条目数，以及缓存命中率。
+
+    计数器在 enable() 时清零，可以用 snapshot() 取得字典形式的结果，用 to_prometheus() 取得
+    Prometheus 文本格式的结果，或用 write() 写入文件。缓存命中数只统计 enable() 或 reset() 之后的部分。
+    """
+    def __init__(self):
+        self.enabled: bool = False
+        self.stages: Dict[str, _StageCounter] = {}
+        self._originals: List[Tuple[object, str, object]] = [] # (所属对象, 属性名, 原属性值)
+        self._cache_base: Dict[str, Tuple[int, int]] = {}
+        self._start_ns: int = 0
+
+    def _counter(self, stage: str) -> _StageCounter:
+        return self.stages.setdefault(stage, _StageCounter())
+
+    def _timed(self, stage: str, func: Callable, item_args: Tuple[str, ...] = ()) -> Callable:
+        """返回 func 的计时包装。"""
+        counter = self._counter(stage)
+        clock = time.perf_counter_ns
+        if not item_args:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    counter.ns += clock() - start
+                    counter.calls += 1
+                    counter.items += 1
+            return wrapper
+
+        code = func.__code__
+        indices = [code.co_varnames[:code.co_argcount].index(name) for name in item_args]
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            items = 1
+            for name, index in zip(item_args, indices):
+                value = kwargs[name] if name in kwargs else (args[index] if index < len(args) else None)
+                items *= len(value) if value is not None else 1
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                counter.ns += clock() - start
+                counter.calls += 1
+                counter.items += items
+        return wrapper
+
+    def _install(self, owner, name: str, replacement):
+        self._originals.append((owner, name, owner[name] if isinstance(owner, dict) else owner.__dict__[name]))
+        if isinstance(owner, dict):
+            owner[name] = replacement
+        else:
+            setattr(owner, name, replacement)
+
+    def enable(self):
+        """安装计时包装并清零计数器；已经开启时只清零计数器。"""
+        if not self.enabled:
+            namespace = globals()
+            for stage, name, item_args in PROFILED_FUNCTIONS:
+                self._install(namespace, name, self._timed(stage, namespace[name], item_args))
+            for stage, name in PROFILED_METHODS:
+                self._install(TransistorAmplifier, name, self._timed(stage, TransistorAmplifier.__dict__[name]))
+            for cls in AMPLIFIER_TYPES.values():
+                kernel = cls.__dict__['ac_kernel'].__func__
+                self._install(cls, 'ac_kernel', staticmethod(self._timed(f"ac.{cls.topology}", kernel)))
+            self.enabled = True
+        self.reset()
+
+    def disable(self):
+        """换回原函数，计数器保留到下一次 enable() 或 reset()。"""
+        for owner, name, original in reversed(self._originals):
+            if isinstance(owner, dict):
+                owner[name] = original
+            else:
+                setattr(owner, name, original)
+        self._originals.clear()
+        self.enabled = False
+
+    def reset(self):
+        """清零计数器，并以当前的缓存统计作为命中率的起点。"""
+        for counter in self.stages.values():
+            counter.calls = counter.ns = counter.items = 0
+        namespace = globals()
+        self._cache_base = {name: namespace[name].cache_info()[:2] for name in PROFILED_CACHES}
+        self._start_ns = time.perf_counter_ns()
+
+    def snapshot(self) -> dict:
+        """以字典形式返回各阶段的计数和缓存命中率，耗时单位为秒，mean_us 为每次调用的平均耗时 (us)。"""
+        stages = {
+            stage: {
+                'calls': c.calls, 'seconds': c.ns / 1e9, 'items': c.items,
+                'mean_us': c.ns / c.calls / 1e3 if c.calls else float('nan'),
+            }
+            for stage, c in sorted(self.stages.items())
+        }
+        caches = {}
+        namespace = globals()
+        for name in PROFILED_CACHES:
+            info = namespace[name].cache_info()
+            base_hits, base_misses = self._cache_base.get(name, (0, 0))
+            hits, misses = info.hits - base_hits, info.misses - base_misses
+            caches[name] = {'hits': hits, 'misses': misses, 'size': info.currsize,
+                            'hit_rate': hits / (hits + misses) if hits + misses else float('nan')}
+        return {'enabled': self.enabled, 'elapsed_seconds': (time.perf_counter_ns() - self._start_ns) / 1e9,
+                'stages': stages, 'caches': caches}
+
+    def to_prometheus(self) -> str:
+        """以 Prometheus 文本格式（可供 node_exporter 的 textfile 收集器读取）返回各项计数。"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name: str, help_text: str, kind: str, samples: List[Tuple[str, str, float]]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for label, value, number in samples:
+                lines.append(f'{name}{{{label}="{value}"}} {number!r}')
+
+        stages = snapshot['stages']
+        metric('amplifier_stage_calls_total', "各计算阶段的调用次数", 'counter',
+               [('stage', stage, s['calls']) for stage, s in stages.items()])
+        metric('amplifier_stage_seconds_total', "各计算阶段的累计耗时（秒，包含嵌套阶段）", 'counter',
+               [('stage', stage, s['seconds']) for stage, s in stages.items()])
+        metric('amplifier_stage_items_total', "各计算阶段处理的条目数", 'counter',
+               [('stage', stage, s['items']) for stage, s in stages.items()])
+        caches = snapshot['caches']
+        metric('amplifier_cache_hits_total', "缓存命中次数", 'counter',
+               [('cache', name, c['hits']) for name, c in caches.items()])
+        metric('amplifier_cache_misses_total', "缓存未命中次数", 'counter',
+               [('cache', name, c['misses']) for name, c in caches.items()])
+        lines.append("# HELP amplifier_profile_elapsed_seconds 开始剖析以来经过的时间（秒）")
+        lines.append("# TYPE amplifier_profile_elapsed_seconds gauge")
+        lines.append(f"amplifier_profile_elapsed_seconds {snapshot['elapsed_seconds']!r}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, fmt: Optional[str] = None):
+        """把剖析结果写入文件；fmt 为 'json' 或 'prometheus'，省略时按扩展名 .prom 判断。
+
+        JSON 中没有调用过的阶段的 mean_us 和没有访问过的缓存的 hit_rate 写为 null。
+        """
+        fmt = fmt or ('prometheus' if path.endswith('.prom') else 'json')
+        if fmt not in ('json', 'prometheus'):
+            raise ValueError(f"无效的剖析输出格式 '{fmt}'，应为 'json' 或 'prometheus'。")
+        text = self.to_prometheus() if fmt == 'prometheus' else json.dumps(_finite_or_none(self.snapshot()), indent=2) + "\n"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+PROFILER = Profiler()
+
+
+def iter_batch_file(path: str, chunk_size: int = 4096):
+    """逐块读取批量文件，每次产生最多 chunk_size 个电路描述，空行和以 # 开头的行会被忽略。
+
+    无法解析的行不会中断读取，而是在对应位置产生 {"error": 错误信息}，计算时原样作为该行的结果。
+    """
+    specs = []
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                try:
+                    specs.append(json.loads(line))
+                except ValueError as e: # JSONDecodeError
+                    specs.append({'error': f"{type(e).__name__}: 第 {number} 行：{e}"})
+                if len(specs) >= chunk_size:
+                    yield specs
+                    specs = []
+    if specs:
+        yield specs
+
+
+def load_batch_file(path: str) -> List[dict]:
+    """读取批量文件：每行一个 JSON 电路描述，空行和以 # 开头的行会被忽略，无法解析的行见 iter_batch_file。"""
+    return [spec for chunk in iter_batch_file(path) for spec in chunk]
+
+
+def _finite_or_none(value):
+    """把结果中的 NaN 和正负无穷大（递归地）替换为 None。"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite_or_none(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_or_none(v) for v in value]
+    return value
+
+
+def format_result(result: dict, compact: bool = False) -> str:
+    """把一个计算结果格式化为一行标准 JSON（不含换行），compact 为 True 时省略分隔符后的空格。
+
+    NaN 和正负无穷大不是合法的 JSON 数值，输出为 null；原因可以从 dc_status 等字段判断。
+    """
+    separators = (',', ':') if compact else None
+    try:
+        return json.dumps(result, ensure_ascii=False, separators=separators, allow_nan=False)
+    except ValueError: # 含有 NaN 或无穷大
+        return json.dumps(_finite_or_none(result), ensure_ascii=False, separators=separators)
+
+
+def run_pipe(evaluate: Callable[[List[dict]], List[dict]], batch_size: int = 64, flush: str = 'record',
+             input_fd: int = 0, output=None):
+    """管道模式：从 input_fd 逐行读取 JSON 电路描述，向 output 逐行写出 JSON 结果，直到输入结束。
+
+    已经到达的行会按最多 batch_size 个一批交给 evaluate 计算，但不会为了凑满一批而等待后续输入，
+    因此逐条提问、逐条等待回答的调用方也不会被阻塞。结果顺序与输入顺序一致；空行被忽略，
+    无法解析的行在对应位置输出 {"error": 错误信息}，NaN 和无穷大输出为 null（见 format_result）。flush 为 'record' 时每写一条结果刷新一次输出，
+    为 'batch' 时每批刷新一次。
+    """
+    if flush not in ('record', 'batch'):
+        raise ValueError(f"无效的刷新方式 '{flush}'，应为 'record' 或 'batch'。")
+    output = output if output is not None else sys.stdout
+    pending = b''
+    while True:
+        chunk = os.read(input_fd, 1 << 16)
+        if chunk:
+            pending += chunk
+            lines = pending.split(b'\n')
+            pending = lines.pop() # 最后一段可能是不完整的行
+        else:
+            lines, pending = [pending], b'' # 输入结束，处理最后一行
+        lines = [line for line in (raw.strip() for raw in lines) if line]
+
+        for start in range(0, len(lines), batch_size):
+            results: List[Optional[dict]] = []
+            specs = []
+            positions = []
+            for line in lines[start:start + batch_size]:
+                try:
+                    specs.append(json.loads(line))
+                    positions.append(len(results))
+                    results.append(None)
+                except ValueError as e: # 包括 JSONDecodeError 和 UnicodeDecodeError
+                    results.append({'error': f"{type(e).__name__}: {e}"})
+            for i, result in zip(positions, evaluate(specs)):
+                results[i] = result
+            for result in results:
+                output.write(format_result(result, compact=True) + "\n")
+                if flush == 'record':
+                    output.flush()
+            if flush == 'batch':
+                output.flush()
+
+        if not chunk:
+            break
+
+
+def _parse_histogram(text: str) -> Tuple[str, Tuple[float, float, int]]:
+    """解析命令行中 FIELD:LOW:HIGH:BINS 形式的直方图设置。"""
+    try:
+        field, low, high, bins = text.rsplit(':', 3)
+        return field, (float(low), float(high), int(bins))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的直方图设置 '{text}'，应为 FIELD:LOW:HIGH:BINS。")
+
+
+def _parse_float_list(text: str) -> List[float]:
+    """解析命令行中逗号分隔的数值列表。"""
+    try:
+        return [float(v) for v in text.split(',') if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的数值列表 '{text}'。")
+
+
+def _parse_source_resistances(text: str) -> List[float]:
+    """解析命令行中逗号分隔的信号源内阻列表，内阻不能为负数。"""
+    values = _parse_float_list(text)
+    if any(v < 0.0 for v in values):
+        raise argparse.ArgumentTypeError(f"无效的信号源内阻 '{text}'，内阻不能为负数。")
+    return values
+
+
 # 主程序入口
+def main(argv: Optional[List[str]] = None):
+    """命令行入口：默认交互式计算单个电路，--batch 批量计算文件中的电路，--pipe 进入管道模式。"""
+    parser = argparse.ArgumentParser(description="计算晶体管放大电路的直流工作点和交流小信号参数。")
+    parser.add_argument('--topology', choices=sorted(AMPLIFIER_TYPES), default='ce',
+                        help="交互计算的电路组态：ce 共射极（默认）、cc 共集电极、cb 共基极")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="批量计算：FILE 每行一个 JSON 电路描述，每个结果以一行 JSON 输出到标准输出")
+    parser.add_argument('--thd', metavar='AMPLITUDES', type=_parse_float_list,
+                        help="同时计算谐波失真：逗号分隔的输入正弦幅值 (V)，例如 0.001,0.005,0.01")
+    parser.add_argument('--noise', metavar='RS', type=_parse_source_resistances,
+                        help="同时计算噪声：逗号分隔的信号源内阻 (kOhm)，例如 0.05,1,10")
+    parser.add_argument('--noise-freq', metavar='FREQS', type=_parse_float_list,
+                        default=[10.0, 100.0, 1000.0, 10000.0, 100000.0],
+                        help="噪声计算的频率点 (Hz)，默认 10,100,1000,10000,100000")
+    parser.add_argument('--summary', action='store_true',
+                        help="批量计算时只输出汇总统计（均值、方差、分位数、直方图），不输出每个电路的结果")
+    parser.add_argument('--summary-fields', type=lambda text: tuple(v.strip() for v in text.split(',') if v.strip()),
+                        default=('ic', 'vce', 'au'), help="汇总统计的字段，默认 ic,vce,au")
+    parser.add_argument('--group-by', type=lambda text: tuple(v.strip() for v in text.split(',') if v.strip()),
+                        default=(), help="汇总统计的分组字段（电路描述中的键），例如 transistor,vcc")
+    parser.add_argument('--histogram', metavar='FIELD:LOW:HIGH:BINS', action='append', type=_parse_histogram,
+                        help="汇总统计的直方图，可重复指定，默认 ri:0:100:50")
+    parser.add_argument('--find-resistor', metavar='TARGET', type=float,
+                        help="查找凑出目标阻值 TARGET (kOhm) 的标准电阻串联/并联组合")
+    parser.add_argument('--series', default='E24', help="标准电阻系列（E3 ~ E192，默认 E24）")
+    parser.add_argument('--tolerance', type=float, default=0.01, help="组合阻值的相对误差上限（默认 0.01）")
+    parser.add_argument('--max-parts', type=int, default=3, help="组合中电阻数量上限（1 ~ 4，默认 3）")
+    parser.add_argument('--pipe', action='store_true',
+                        help="管道模式：持续从标准输入读取每行一个 JSON 电路描述，每个结果以一行 JSON 输出")
+    parser.add_argument('--batch-size', type=int, default=64,
+                        help="管道模式下每批最多计算的电路数（默认 64）")
+    parser.add_argument('--flush', choices=('record', 'batch'), default='record',
+                        help="管道模式下的输出刷新方式：record 每条结果刷新（默认），batch 每批刷新")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="记录各计算阶段的调用次数、耗时和缓存命中率，程序结束时写入 FILE")
+    parser.add_argument('--profile-format', choices=('json', 'prometheus'),
+                        help="剖析结果的格式，默认按扩展名判断（.prom 为 prometheus，其余为 json）")
+    args = parser.parse_args(argv)
+
+    def evaluate(specs: List[dict]) -> List[dict]:
+        """按命令行选项批量计算，附加谐波失真和噪声结果（直流工作点和交流特性只计算一次）。"""
+        results, rows, positions = _parse_batch(specs)
+        _evaluate_rows(specs, results, rows, positions)
+        if args.thd:
+            _add_thd(results, rows, positions, args.thd)
+        if args.noise:
+            _add_noise(results, rows, positions, args.noise, args.noise_freq)
+        return results
+
+    if args.profile:
+        PROFILER.enable()
+    try:
+        if args.find_resistor is not None:
+            combinations = find_resistor_combinations(args.find_resistor, args.tolerance, args.series, args.max_parts)
+            if not combinations:
+                print(f"没有找到误差在 {args.tolerance * 100:g} % 以内的组合。")
+            for c in combinations:
+                joined = (' // ' if c.is_parallel else ' + ').join(f"{v:g}" for v in c.values)
+                print(f"{joined} = {c.equivalent:.6g} kOhm（{'并联' if c.is_parallel else '串联'}，误差 {c.error * 100:+.4f} %）")
+            return
+
+        if args.pipe:
+            run_pipe(evaluate, max(1, args.batch_size), args.flush, sys.stdin.fileno())
+            return
+
+        if args.batch:
+            aggregator = BatchAggregator(args.summary_fields, histograms=dict(args.histogram) if args.histogram else None,
+                                         group_by=args.group_by) if args.summary else None
+            for specs in iter_batch_file(args.batch):
+                results = evaluate(specs)
+                if aggregator is not None:
+                    aggregator.add_batch(specs, results)
+                else:
+                    for result in results:
+                        sys.stdout.write(format_result(result) + "\n")
+            if aggregator is not None:
+                sys.stdout.write(json.dumps(_finite_or_none(aggregator.summary()), ensure_ascii=False, indent=2) + "\n")
+            return
+
+        circuit = AMPLIFIER_TYPES[args.topology]()
+        circuit.get_parameters_input()
+        circuit.calculate_dc_operating_point()
+        circuit.calculate_ac_characteristics()
+        circuit.print_results()
+        if args.thd and not math.isnan(circuit.au):
+            print("\n谐波失真：")
+            for point in circuit.calculate_thd(args.thd):
+                thd = point['thd']
+                print(f"输入幅值 {point['amplitude']:g} V：THD = {'NaN' if math.isnan(thd) else f'{thd:.4f} %'}")
+        if args.noise and not math.isnan(circuit.au):
+            print("\n噪声（输入端等效噪声密度 / 噪声系数）：")
+            density, figure = circuit.calculate_noise(args.noise, args.noise_freq)
+            for rs, en_row, nf_row in zip(args.noise, density, figure):
+                for f, en, nf in zip(args.noise_freq, en_row, nf_row):
+                    print(f"Rs = {rs:g} kOhm, f = {f:g} Hz：en = {en:.4f} nV/√Hz，NF = {nf:.4f} dB")
+        print("\n程序运行完毕。")
+    finally:
+        if args.profile:
+            PROFILER.write(args.profile, args.profile_format) # 先写入，快照中的 enabled 才是 true
+            PROFILER.disable()
+
+
 if __name__ == "__main__":
-    circuit = CommonEmitterAmplifier()
-    circuit.get_parameters_input()
-    circuit.calculate_dc_operating_point()
-    circuit.calculate_ac_characteristics()
-    circuit.print_results()
-    print("\n程序运行完毕。")
\ No newline at end of file
+    main()
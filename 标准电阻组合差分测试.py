@@ -0,0 +1,159 @@
+# MIT License
+#
+# Copyright (c) 2025 XianYin69
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# 文件名: 标准电阻组合差分测试.py
+# 功能: 随机生成目标阻值、E 系列、误差和电阻数量上限，把 晶体管放大电路（OOP Version）.py 中
+#      find_resistor_combinations 返回的完整排序结果与穷举所有组合得到的结果逐级对比。
+# 注意: 穷举的代价随电阻数量增长很快，E24 及更密的系列只测试最多 3 个电阻的组合。
+# 用法: python 标准电阻组合差分测试.py --cases 200 --seed 1
+
+from typing import Dict, List, Optional, Tuple
+import argparse
+import importlib.util
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OOP_PATH = os.path.join(BASE_DIR, "晶体管放大电路（OOP Version）.py")
+
+# 参与测试的 E 系列及其穷举的电阻数量上限
+SERIES_MAX_PARTS: Dict[str, int] = {'E3': 4, 'E6': 4, 'E12': 4, 'E24': 3}
+
+ERROR_EPS = 1e-12 # 比较误差时的容差（相对误差的绝对差）
+
+
+def load_oop_module():
+    """加载 OOP 版本（文件名含中文和括号，不能直接 import）。"""
+    spec = importlib.util.spec_from_file_location("amplifier_oop", OOP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_query(rng: random.Random) -> dict:
+    """随机生成一次查询的参数。"""
+    series = rng.choice(sorted(SERIES_MAX_PARTS))
+    return {
+        'target': round(10 ** rng.uniform(-1.0, 3.0), 4),
+        'tolerance': rng.choice([1e-5, 1e-4, 0.001, 0.005, 0.01, 0.02, 0.05]), # 误差越小越常用到 4 个电阻
+        'series': series,
+        'max_parts': rng.randint(1, SERIES_MAX_PARTS[series]),
+        'limit': rng.choice([1, 3, 5, 10, 20]),
+        'span': rng.choice([1, 2, 3]),
+    }
+
+
+def brute_force(oop, query: dict) -> List[Tuple[Tuple[float, ...], bool, float]]:
+    """穷举与 find_resistor_combinations 相同候选范围内的全部组合，按相同规则排序截取。
+
+    返回 [(阻值, 是否并联, 相对误差)]。
+    """
+    target, tolerance = query['target'], query['tolerance']
+    decade = math.floor(math.log10(target))
+    candidates = {False: oop._combination_tables(query['series'], decade - query['span'], decade, False)[1],
+                  True: oop._combination_tables(query['series'], decade, decade + query['span'], True)[1]}
+    results = []
+    for parts in range(1, query['max_parts'] + 1):
+        level = {}
+        for parallel in ((False,) if parts == 1 else (False, True)):
+            for values in itertools.combinations_with_replacement(sorted(candidates[parallel]), parts):
+                equivalent = oop.equivalent_resistance(list(values), parallel)
+                error = (equivalent - target) / target
+                if abs(error) <= tolerance:
+                    level[(values, parallel)] = error
+        ranked = sorted(level.items(), key=lambda item: abs(item[1]))
+        results.extend((values, parallel, error) for (values, parallel), error in ranked[:query['limit'] - len(results)])
+        if len(results) >= query['limit']:
+            break
+    return results
+
+
+def compare(actual: List[Tuple[Tuple[float, ...], bool, float]], expected: List[Tuple[Tuple[float, ...], bool, float]],
+            tolerance: float) -> Optional[str]:
+    """逐级对比两个排序结果，返回不一致的说明（一致时返回 None）。
+
+    误差恰好相同的组合之间顺序不定；某一级被截断时，与最后一个保留结果误差相同的组合可以互换。
+    """
+    if len(actual) != len(expected):
+        return f"结果数量不同：{len(actual)} != {len(expected)}"
+    for position, (a, e) in enumerate(zip(actual, expected)):
+        if len(a[0]) != len(e[0]):
+            return f"第 {position + 1} 个结果的电阻数量不同：{a} / {e}"
+        if abs(abs(a[2]) - abs(e[2])) > ERROR_EPS:
+            return f"第 {position + 1} 个结果的误差不同：{a} / {e}"
+        if abs(a[2]) > tolerance + ERROR_EPS:
+            return f"第 {position + 1} 个结果超出误差范围：{a}"
+    for parts in {len(r[0]) for r in expected}:
+        cut = max(abs(r[2]) for r in expected if len(r[0]) == parts) - ERROR_EPS
+        keys_a = {(r[0], r[1]) for r in actual if len(r[0]) == parts and abs(r[2]) < cut}
+        keys_e = {(r[0], r[1]) for r in expected if len(r[0]) == parts and abs(r[2]) < cut}
+        if keys_a != keys_e:
+            return f"{parts} 个电阻的组合不同：缺少 {sorted(keys_e - keys_a)[:3]}，多出 {sorted(keys_a - keys_e)[:3]}"
+    return None
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口：有不一致时以状态码 1 退出。"""
+    parser = argparse.ArgumentParser(description="对比标准电阻组合查找与穷举的结果。")
+    parser.add_argument('--cases', type=int, default=200, help="查询次数（默认 200）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子（相同种子生成相同的查询）")
+    parser.add_argument('--examples', type=int, default=5, help="输出的不一致示例数（默认 5）")
+    parser.add_argument('--json', metavar='FILE', help="把统计结果和不一致的查询写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    oop = load_oop_module()
+    rng = random.Random(args.seed)
+    mismatches = []
+    finder_seconds = 0.0
+    start = time.perf_counter()
+    for case in range(args.cases):
+        query = generate_query(rng)
+        t0 = time.perf_counter()
+        found = oop.find_resistor_combinations(**query)
+        finder_seconds += time.perf_counter() - t0
+        actual = [(c.values, c.is_parallel, c.error) for c in found]
+        reason = compare(actual, brute_force(oop, query), query['tolerance'])
+        if reason is not None:
+            mismatches.append({'query': query, 'reason': reason})
+        sys.stderr.write(f"\r已完成 {case + 1}/{args.cases} 次查询")
+    sys.stderr.write("\n")
+    elapsed = time.perf_counter() - start
+
+    print(f"查询 {args.cases} 次，不一致 {len(mismatches)} 次，总耗时 {elapsed:.2f} 秒，"
+          f"查找平均 {finder_seconds / args.cases * 1e3 if args.cases else 0.0:.3f} ms/次")
+    for mismatch in mismatches[:args.examples]:
+        print(f"  {json.dumps(mismatch['query'])}：{mismatch['reason']}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'cases': args.cases, 'elapsed': elapsed, 'mismatches': mismatches}, f,
+                      ensure_ascii=False, indent=2)
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()